@@ -158,6 +158,19 @@ class UniversalPublishUI(MayaQWidgetDockableMixin, qt.QWidget):
         self.media_playblast_radio.setChecked(True)
 
         media_layout.addWidget(self.media_playblast_radio)
+
+        # Draft playblast (half res, no textures, every 2nd frame) for fast dailies
+        self.draft_playblast_check = qt.QCheckBox("Draft playblast (fast dailies)")
+        self.draft_playblast_check.setToolTip("Half resolution, no textures, flat shading, every 2nd frame")
+        self.draft_playblast_check.setStyleSheet("QCheckBox { margin-left: 20px; }")
+        media_layout.addWidget(self.draft_playblast_check)
+
+        # Streaming playblast: viewport frames piped to ffmpeg, no images on disk
+        self.streaming_playblast_check = qt.QCheckBox("Stream playblast to encoder")
+        self.streaming_playblast_check.setToolTip("Encode while capturing, no images on disk (keep the viewport visible)")
+        self.streaming_playblast_check.setStyleSheet("QCheckBox { margin-left: 20px; }")
+        media_layout.addWidget(self.streaming_playblast_check)
+
         media_layout.addWidget(self.media_images_radio)
 
         # Folder selector (solo visible si se selecciona images)
@@ -214,6 +227,15 @@ class UniversalPublishUI(MayaQWidgetDockableMixin, qt.QWidget):
         # === SPACER ===
         main_layout.addStretch()
 
+        # === RESUME ===
+        # Only shown if a failed publish of this scene left a checkpoint
+        from wknd_tools.core import checkpoint
+        self.resume_check = qt.QCheckBox("Resume failed publish (skip completed steps)")
+        self.resume_check.setToolTip("Reuses the Version and the exports of the failed publish that are still intact")
+        self.resume_check.setChecked(True)
+        self.resume_check.setVisible(checkpoint.exists(cmds.file(query=True, sceneName=True)))
+        main_layout.addWidget(self.resume_check)
+
         # === PUBLISH BUTTON ===
         self.publish_btn = qt.QPushButton("PUBLISH")
         self.publish_btn.setMinimumHeight(50)
@@ -244,6 +266,8 @@ class UniversalPublishUI(MayaQWidgetDockableMixin, qt.QWidget):
         """Activa/desactiva el botón de browse según el tipo de media."""
         is_folder = self.media_images_radio.isChecked()
         self.folder_browse_btn.setEnabled(is_folder)
+        self.draft_playblast_check.setEnabled(not is_folder)
+        self.streaming_playblast_check.setEnabled(not is_folder)
         
         if not is_folder:
             self.media_folder = None
@@ -289,6 +313,9 @@ class UniversalPublishUI(MayaQWidgetDockableMixin, qt.QWidget):
             # Obtener datos
             description = self.description_text.toPlainText()
             use_playblast = self.media_playblast_radio.isChecked()
+            draft_playblast = use_playblast and self.draft_playblast_check.isChecked()
+            streaming_playblast = use_playblast and self.streaming_playblast_check.isChecked()
+            resume = not self.resume_check.isHidden() and self.resume_check.isChecked()
             
             # Log de contexto
             self.log(f"📦 Entity: {self.context_info['entity_name']}")
@@ -300,10 +327,16 @@ class UniversalPublishUI(MayaQWidgetDockableMixin, qt.QWidget):
             import importlib
             importlib.reload(publish_version)
 
-            publisher = publish_version.Publisher(self.context, self.current_version, description, self.asset_type, use_playblast, self.media_folder, self.log)
+            # Uploads finish in background, tell the user when they are done
+            from wknd_tools.core import upload_queue
+            upload_queue.get_upload_queue().add_listener(_notify_upload_done, key='publisher_ui')
+
+            publisher = publish_version.Publisher(self.context, self.current_version, description, self.asset_type, use_playblast, self.media_folder, self.log, draft_playblast=draft_playblast, resume=resume, streaming_playblast=streaming_playblast)
             publish_result = publisher.publish()
             
             self.log("✅ PUBLISH COMPLETE")
+            if publisher.results.get('uploads'):
+                self.log("⏳ Media uploading in background, you will be notified when it is done")
             
             # Mostrar resultado
             qt.QMessageBox.information(
@@ -325,6 +358,23 @@ class UniversalPublishUI(MayaQWidgetDockableMixin, qt.QWidget):
             self.close()
 
 
+def _notify_upload_done(job, success, error):
+    """Upload queue listener, runs in the upload thread so the message is deferred to Maya's main thread"""
+    import maya.utils
+
+    file_name = os.path.basename(job['path'])
+    if success:
+        message = f"✅ Upload complete: {file_name}"
+    else:
+        message = f"❌ Upload failed: {file_name} ({error})"
+
+    def _show():
+        print(message)
+        cmds.inViewMessage(assistMessage=message, position='topCenter', fade=True)
+
+    maya.utils.executeDeferred(_show)
+
+
 def showUI():
     """Muestra la ventana de publish."""
     global universal_publish_ui
@@ -0,0 +1,162 @@
+"""Publish checkpoints: completed steps of a publish journaled on local disk, so a failed publish can resume"""
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from . import manifest
+import importlib
+importlib.reload(manifest)
+
+
+# One journal per work scene, on local disk. Can be moved with WKND_PUBLISH_CHECKPOINTS
+CHECKPOINT_DIR = os.environ.get('WKND_PUBLISH_CHECKPOINTS', os.path.join(os.path.expanduser('~'), '.wknd_tools', 'publish_checkpoints'))
+
+
+def _checkpoint_path(work_file):
+    key = hashlib.sha1(os.path.normcase(os.path.normpath(work_file)).encode()).hexdigest()
+    return os.path.join(CHECKPOINT_DIR, f"{key}.json")
+
+
+def exists(work_file):
+    """True if a publish of this work scene failed and can be resumed"""
+    return bool(work_file) and os.path.exists(_checkpoint_path(work_file))
+
+
+class PublishCheckpoint:
+    """
+    Journal of one publish: the Version it created and every completed step with its
+    outputs (size, mtime and blake2b, see manifest.file_entry) and the results it set.
+
+    Written after every step, removed when the publish succeeds. Outputs are hashed
+    in background threads, so the next step does not wait for them. A resumed publish
+    reuses the Version and skips every step whose outputs are still intact.
+    """
+
+    def __init__(self, work_file, resume=False):
+        """
+        Args:
+            work_file (str): Work scene being published (the journal key)
+            resume (bool): Load the journal of a previous failed publish, else start empty
+        """
+        self.path = _checkpoint_path(work_file)
+        self.data = {'work_file': work_file, 'created': time.time(), 'version': None, 'steps': {}}
+        self._lock = threading.Lock()
+        self._hashing = []
+        self._pool = None
+
+        if resume and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ Publish checkpoint unreadable, starting again: {e}")
+
+    @property
+    def version(self):
+        return self.data.get('version')
+
+    def set_version(self, version):
+        with self._lock:
+            self.data['version'] = {'type': 'Version', 'id': version['id'], 'code': version.get('code')}
+            self._save()
+
+    def reset(self):
+        """Forget the Version and every step (ej: the Version was deleted)"""
+        self.flush()
+        with self._lock:
+            self.data.update(version=None, steps={})
+            self._save()
+
+    def is_done(self, step):
+        """
+        True if step completed and its outputs did not change since: same size and
+        mtime, or same checksum when only the mtime changed
+        """
+        saved = self.data['steps'].get(step)
+        if not saved:
+            return False
+
+        for entry in saved['outputs']:
+            path = entry['path']
+            if not os.path.isfile(path):
+                return False
+            stat = os.stat(path)
+            if stat.st_size != entry['size']:
+                return False
+            if stat.st_mtime != entry['mtime'] and manifest.checksum(path) != entry.get('blake2b'):
+                return False
+
+        return True
+
+    def get_step(self, step):
+        return self.data['steps'].get(step)
+
+    def done(self, step, outputs, results=None, sources=None):
+        """
+        Record a completed step. Size and mtime are written now, the checksums when
+        the background hashing of the outputs finishes
+
+        Args:
+            step (str): Step name
+            outputs (list): Files the step published
+            results (dict): Publisher results to restore when the step is skipped
+            sources (dict): {output: file to read it from}, for outputs still being transferred
+        """
+        sources = sources or {}
+        entries = []
+        for path in outputs:
+            stat = os.stat(sources.get(path, path))
+            entries.append({'path': path, 'size': stat.st_size, 'mtime': stat.st_mtime})
+
+        with self._lock:
+            self.data['steps'][step] = {'outputs': entries, 'results': results or {}, 'finished': time.time()}
+            self._save()
+
+        if entries:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=manifest.MAX_WORKERS, thread_name_prefix='wknd_checkpoint')
+            for entry in entries:
+                self._hashing.append(self._pool.submit(self._hash_entry, entry, sources.get(entry['path'], entry['path'])))
+
+    def flush(self):
+        """Wait until every output recorded so far is hashed and journaled"""
+        hashing, self._hashing = self._hashing, []
+        wait(hashing)
+
+    def entries(self):
+        """{path: entry} of every recorded output (lets the manifest skip hashing them again)"""
+        self.flush()
+        return {entry['path']: entry for saved in self.data['steps'].values() for entry in saved['outputs']
+                if 'blake2b' in entry}
+
+    def clear(self):
+        """Remove the journal (publish finished)"""
+        self.flush()
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _hash_entry(self, entry, source):
+        try:
+            digest = manifest.checksum(source)
+        except OSError as e:
+            print(f"⚠ Cannot hash publish output {entry['path']}: {e}")
+            return
+
+        with self._lock:
+            entry['blake2b'] = digest
+            self._save()
+
+    def _save(self):
+        """Write journal atomically (call with the lock held)"""
+        if not os.path.exists(CHECKPOINT_DIR):
+            os.makedirs(CHECKPOINT_DIR)
+
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.data, f, indent=4)
+        os.replace(temp_path, self.path)
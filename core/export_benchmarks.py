@@ -0,0 +1,95 @@
+"""Dev benchmarks for the exporters (they really export, run them on a test scene)"""
+import maya.cmds as mc
+import os
+import time
+from . import exporters
+import importlib
+importlib.reload(exporters)
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def _ma_statements(file_path):
+    """Lines of a .ma without header comments, uids and fileInfo (they change on every export)"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return [line for line in f
+                if not line.startswith(('//', 'fileInfo'))
+                and not line.lstrip().startswith('rename -uid')]
+
+
+def benchmark_asset_export(object_to_export, output_dir, repeat=3):
+    """
+    Time export_maya_asset with the parent stripped at write time against the old
+    parent to world / export / parent back, and check both files hold the same scene.
+
+    Args:
+        object_to_export (str): Asset geo group (ej: 'asset|geo')
+        output_dir (str): Folder for the test files
+        repeat (int): Exports per method, the best time is kept
+
+    Returns:
+        dict: {'reparent': seconds, 'strip': seconds, 'identical': bool}
+    """
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    reparent_path = os.path.join(output_dir, 'benchmark_reparent.ma')
+    strip_path = os.path.join(output_dir, 'benchmark_strip.ma')
+
+    # Both inside a session so only the export method differs
+    with exporters.export_session.ExportSession('asset export benchmark'):
+        reparent = min(_timed(exporters._export_asset_with_reparent, object_to_export, reparent_path)
+                       for _ in range(repeat))
+        strip = min(_timed(exporters._export_asset_strip_parents, object_to_export, strip_path)
+                    for _ in range(repeat))
+
+    identical = _ma_statements(reparent_path) == _ma_statements(strip_path)
+
+    print(f"⏱ {object_to_export}: reparent {reparent:.2f}s, strip parents {strip:.2f}s "
+          f"({reparent - strip:+.2f}s saved) - output {'identical' if identical else 'DIFFERS'}")
+
+    return {'reparent': reparent, 'strip': strip, 'identical': identical}
+
+
+def benchmark_scene_formats(output_dir, repeat=1):
+    """
+    Round trip of the current scene in mayaAscii and mayaBinary: save time, file size
+    and open time. Opens the test files, so the scene must be saved first; it is
+    opened again at the end.
+
+    Args:
+        output_dir (str): Folder for the test files
+        repeat (int): Save/open rounds per format, the best time is kept
+
+    Returns:
+        dict: {'mayaAscii': {'save': s, 'open': s, 'size': bytes}, 'mayaBinary': {...}}
+    """
+
+    current_file = mc.file(query=True, sceneName=True)
+    if not current_file or mc.file(query=True, modified=True):
+        raise RuntimeError("Save the scene before the benchmark, it opens other files")
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    results = {}
+    try:
+        for file_type, extension in exporters.SCENE_EXTENSIONS.items():
+            path = os.path.join(output_dir, f"benchmark_scene{extension}")
+
+            mc.file(current_file, open=True, force=True)
+            save = min(_timed(mc.file, path, exportAll=True, type=file_type, force=True) for _ in range(repeat))
+            open_time = min(_timed(mc.file, path, open=True, force=True) for _ in range(repeat))
+
+            results[file_type] = {'save': save, 'open': open_time, 'size': os.path.getsize(path)}
+            print(f"⏱ {file_type}: save {save:.2f}s, open {open_time:.2f}s, "
+                  f"{results[file_type]['size'] / 1024 ** 2:.1f} MB")
+    finally:
+        mc.file(current_file, open=True, force=True)
+
+    return results
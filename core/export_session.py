@@ -0,0 +1,136 @@
+"""Export session: suspends viewport refresh, undo, autosave and picks the fastest evaluation while exporting"""
+import maya.cmds as mc
+import functools
+import time
+
+
+# Evaluation mode used while exporting (parallel is the fastest for caching)
+EXPORT_EVALUATION_MODE = 'parallel'
+
+# (label, seconds) of every finished outermost session, see timing_report
+timings = []
+
+_depth = 0
+
+
+class ExportSession:
+    """
+    Context shared by every exporter. Only the outermost session changes the scene
+    state, nested sessions (an exporter called inside a publish session) just time.
+
+    While active:
+        - Viewport refresh suspended
+        - Undo recording off (queue is kept, not flushed)
+        - Evaluation manager in EXPORT_EVALUATION_MODE
+        - Autosave disabled
+
+    Everything is restored on exit, also if the export fails.
+    """
+
+    def __init__(self, label='export', enabled=True):
+        self.label = label
+        self.enabled = enabled
+        self.elapsed = None
+        self._state = None
+        self._start = None
+
+    def __enter__(self):
+        global _depth
+        _depth += 1
+        self._start = time.perf_counter()
+
+        if self.enabled and _depth == 1:
+            try:
+                self._state = {
+                    'undo': mc.undoInfo(q=True, state=True),
+                    'evaluation': (mc.evaluationManager(q=True, mode=True) or [None])[0],
+                    'autosave': mc.autoSave(q=True, enable=True),
+                }
+                mc.refresh(suspend=True)
+                mc.undoInfo(stateWithoutFlush=False)
+                if self._state['evaluation'] and self._state['evaluation'] != EXPORT_EVALUATION_MODE:
+                    mc.evaluationManager(mode=EXPORT_EVALUATION_MODE)
+                if self._state['autosave']:
+                    mc.autoSave(enable=False)
+            except Exception:
+                # __exit__ never runs if __enter__ raises: give back what was changed
+                self._restore()
+                _depth -= 1
+                raise
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _depth
+        _depth -= 1
+        self.elapsed = time.perf_counter() - self._start
+
+        self._restore()
+
+        if _depth == 0:
+            timings.append((self.label, self.elapsed))
+
+        print(f"⏱ {self.label}: {self.elapsed:.2f}s")
+
+        return False
+
+
+    def _restore(self):
+        """Restore the scene state saved by the outermost session"""
+        if not self._state:
+            return
+        if self._state['autosave']:
+            mc.autoSave(enable=True)
+        if self._state['evaluation'] and self._state['evaluation'] != EXPORT_EVALUATION_MODE:
+            mc.evaluationManager(mode=self._state['evaluation'])
+        mc.undoInfo(stateWithoutFlush=self._state['undo'])
+        mc.refresh(suspend=False)
+        self._state = None
+
+
+def in_export_session(label):
+    """Decorator: run the exporter inside an ExportSession"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with ExportSession(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def compare_timing(export_func, *args, **kwargs):
+    """
+    Run an export twice, without and with ExportSession, and print both times.
+    Dev/benchmark helper: the export really happens twice.
+
+    Returns:
+        tuple: (seconds_without, seconds_with)
+    """
+    global _depth
+
+    # Force the "without" run to skip the session even if the exporter is decorated
+    start = time.perf_counter()
+    _depth += 1
+    try:
+        export_func(*args, **kwargs)
+    finally:
+        _depth -= 1
+    without_session = time.perf_counter() - start
+
+    with ExportSession(getattr(export_func, '__name__', 'export')) as session:
+        export_func(*args, **kwargs)
+    with_session = session.elapsed
+
+    saved = without_session - with_session
+    print(f"⏱ {getattr(export_func, '__name__', 'export')}: {without_session:.2f}s without session, "
+          f"{with_session:.2f}s with session ({saved:+.2f}s saved)")
+
+    return without_session, with_session
+
+
+def timing_report():
+    """Print and return the times of the finished sessions"""
+    for label, seconds in timings:
+        print(f"⏱ {label}: {seconds:.2f}s")
+    return list(timings)
@@ -1,12 +1,44 @@
 import maya.cmds as mc
 import maya.mel as mm
 import os
+import re
 import glob
+import shutil
 from ..utils import shading_get_textures_from_sg, scene_usd_export_utils
+from . import export_session, workspace
 import importlib
 importlib.reload(shading_get_textures_from_sg)
+importlib.reload(export_session)
+importlib.reload(workspace)
 
 
+# Scene format of publish artifacts, by template name or task step ('mayaAscii' / 'mayaBinary').
+# Binary writes and opens much faster on heavy sets and rigs, use it for files nobody reads by hand.
+# A template entry wins over a step entry, anything not listed is DEFAULT_SCENE_FORMAT
+# (see export_benchmarks.benchmark_scene_formats). Templates that follow it: maya_asset_publish,
+# maya_shot_publish, maya_asset_clean_publish, maya_asset_shader_publish and shot_anim_delta, ej:
+#   'Layout': 'mayaBinary',                     every Layout artifact
+#   'maya_asset_clean_publish': 'mayaAscii',    except the clean asset
+SCENE_FORMATS = {}
+DEFAULT_SCENE_FORMAT = 'mayaAscii'
+
+SCENE_EXTENSIONS = {'mayaAscii': '.ma', 'mayaBinary': '.mb'}
+
+
+def get_scene_format(template_name=None, step=None):
+    """Scene format for a publish template or task step, DEFAULT_SCENE_FORMAT if neither is listed"""
+    return SCENE_FORMATS.get(template_name) or SCENE_FORMATS.get(step) or DEFAULT_SCENE_FORMAT
+
+
+def scene_format_path(file_path, file_type):
+    """file_path with the extension of file_type (templates give .ma, a binary file gets .mb)"""
+    root, extension = os.path.splitext(file_path)
+    if extension.lower() not in SCENE_EXTENSIONS.values():
+        return file_path
+    return root + SCENE_EXTENSIONS[file_type]
+
+
+@export_session.in_export_session('maya scene')
 def export_maya_scene(file_path, file_type='mayaAscii'):
 
     """
@@ -29,6 +61,7 @@ def export_maya_scene(file_path, file_type='mayaAscii'):
     return file_path
 
 
+@export_session.in_export_session('maya asset')
 def export_maya_asset(object_to_export, file_path, file_type='mayaAscii'):
 
     """
@@ -45,15 +78,16 @@ def export_maya_asset(object_to_export, file_path, file_type='mayaAscii'):
     if not os.path.exists(directory):
         os.makedirs(directory)
 
-    mc.select(object_to_export, r=1)
-    parent = mc.listRelatives(object_to_export, p=1)
-    mc.parent(object_to_export, w=1)
-    mc.file(file_path, type=file_type, exportSelected=True, force=True)
-    if parent:
-        mc.parent(mc.ls(sl=1)[0], parent[0])
-    mc.select(cl=1)
+    # Reparenting a rigged asset to world dirties and re-evaluates the whole DAG twice,
+    # so the parents are stripped from the written file instead (ascii only, mayaBinary
+    # files can't be rewritten and still reparent)
+    if file_type == 'mayaAscii' and _parent_is_identity(object_to_export):
+        _export_asset_strip_parents(object_to_export, file_path)
+    else:
+        _export_asset_with_reparent(object_to_export, file_path, file_type)
 
 
+@export_session.in_export_session('alembic')
 def export_alembic(object_to_export, file_path, frameIn, frameOut):
     """
     Export geometry as Alembic
@@ -85,6 +119,7 @@ def export_alembic(object_to_export, file_path, frameIn, frameOut):
     mc.AbcExport(j=abc_cmd)
 
 
+@export_session.in_export_session('ass')
 def export_ass(object_to_export, file_path):
     """
     Export geometry with shaders as ASS
@@ -106,7 +141,8 @@ def export_ass(object_to_export, file_path):
     mm.eval(line)
     mc.select(cl=1)
 
-def export_shaders_and_textures_for_hair(asset_name, shaders_file_path, textures_export_folder):
+@export_session.in_export_session('hair shaders')
+def export_shaders_and_textures_for_hair(asset_name, shaders_file_path, textures_export_folder, file_type='mayaAscii'):
 
     ############################
     # Get Shaders and Textures #
@@ -148,7 +184,7 @@ def export_shaders_and_textures_for_hair(asset_name, shaders_file_path, textures
     # Export shaders #
     ##################
 
-    shaders_file_path = _export_shaders(shaders_list, shaders_file_path)
+    shaders_file_path = _export_shaders(shaders_list, shaders_file_path, file_type)
 
     ##############################################
     # RePath texture nodes to original work file #
@@ -172,7 +208,8 @@ def export_shaders_and_textures_for_hair(asset_name, shaders_file_path, textures
     return shaders_file_path, mesh_shader
 
 
-def export_shaders_and_textures(asset_name, shaders_file_path, textures_export_folder):
+@export_session.in_export_session('shaders')
+def export_shaders_and_textures(asset_name, shaders_file_path, textures_export_folder, file_type='mayaAscii'):
 
     ############################
     # Get Shaders and Textures #
@@ -214,7 +251,7 @@ def export_shaders_and_textures(asset_name, shaders_file_path, textures_export_f
     # Export shaders #
     ##################
 
-    shaders_file_path = _export_shaders(shaders_list, shaders_file_path)
+    shaders_file_path = _export_shaders(shaders_list, shaders_file_path, file_type)
 
     ##############################################
     # RePath texture nodes to original work file #
@@ -238,6 +275,7 @@ def export_shaders_and_textures(asset_name, shaders_file_path, textures_export_f
     return shaders_file_path, mesh_shader
 
 
+@export_session.in_export_session('usd')
 def export_usd(publish_path):
 
     # Ensure publish folder exists
@@ -337,7 +375,7 @@ def _export_textures(mesh_shader, textures_export_folder):
     return texture_work_paths
 
 
-def _export_shaders(shaders_list, shaders_file_path):
+def _export_shaders(shaders_list, shaders_file_path, file_type='mayaAscii'):
 
     # Ensure Shaders folder
     if not os.path.exists(os.path.dirname(shaders_file_path)):
@@ -346,6 +384,186 @@ def _export_shaders(shaders_list, shaders_file_path):
     mc.select(cl=1)
     mc.select(shaders_list, r=1, ne=1)
     mc.file(rename=shaders_file_path)
-    mc.file(op='v=0', force=True, exportSelected=True, type="mayaAscii")
+    mc.file(op='v=0', force=True, exportSelected=True, type=file_type)
 
     return shaders_file_path
+
+
+def _export_asset_with_reparent(object_to_export, file_path, file_type='mayaAscii'):
+    """Export by parenting the group to world and back (mayaBinary, or parents with a transform)"""
+
+    mc.select(object_to_export, r=1)
+    parent = mc.listRelatives(object_to_export, p=1)
+    mc.parent(object_to_export, w=1)
+    mc.file(file_path, type=file_type, exportSelected=True, force=True)
+    if parent:
+        mc.parent(mc.ls(sl=1)[0], parent[0])
+    mc.select(cl=1)
+
+
+def _parent_is_identity(object_to_export):
+    """True if the group has no parent or its parent sits at the origin (reparent would not change its values)"""
+
+    parent = mc.listRelatives(object_to_export, p=1, fullPath=True)
+    if not parent:
+        return True
+
+    matrix = mc.getAttr(f"{parent[0]}.worldMatrix[0]")
+    identity = [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]
+    return all(abs(value - expected) < 1e-9 for value, expected in zip(matrix, identity))
+
+
+def _export_asset_strip_parents(object_to_export, file_path):
+    """
+    Export the group as if it was at world without touching the scene graph.
+
+    exportSelected writes the group with its parents to a local scratch file, then the
+    parents are removed while copying it to file_path: their createNode blocks and
+    connections are dropped and their names are cut from the DAG paths. The file
+    lands on file_path with an atomic rename.
+    """
+
+    long_name = mc.ls(object_to_export, long=True)[0]
+    ancestors = long_name.split('|')[1:-1]
+
+    scratch = workspace.scratch_dir('asset_export')
+    scratch_path = os.path.join(scratch, os.path.basename(file_path))
+
+    try:
+        mc.select(object_to_export, r=1)
+        mc.file(scratch_path, type='mayaAscii', exportSelected=True, force=True)
+        mc.select(cl=1)
+
+        if not ancestors:
+            shutil.copyfile(scratch_path, file_path)
+            return
+
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(scratch_path, 'r', encoding='utf-8') as source, open(temp_path, 'w', encoding='utf-8') as destination:
+            for line in _strip_ma_parents(source, ancestors, long_name.split('|')[-1], os.path.basename(file_path)):
+                destination.write(line)
+        os.replace(temp_path, file_path)
+
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def copy_ma_with_string_attributes(source_path, destination_path, values):
+    """
+    Copy a .ma replacing the values of string attributes (ej: the GUS publish info
+    written on the meshes) and the "//Name:" header. The copy is written next to the
+    destination and renamed into place.
+
+    Args:
+        source_path (str): .ma to copy
+        destination_path (str): New file
+        values (dict): {attribute: new string value}
+
+    Returns:
+        int: setAttr lines rewritten
+
+    Raises:
+        ValueError: One of the attributes is set in a form that can't be rewritten
+            (ej: a long string split in several lines), destination is not written
+    """
+
+    names = '|'.join(re.escape(name) for name in values)
+    set_re = re.compile(r'^(?P<head>\s*setAttr(?: -l on)? "\.(?P<name>' + names + r')" -type "string" )"(?:[^"\\]|\\.)*";$')
+    any_re = re.compile(r'^\s*setAttr\b.*"\.(?:' + names + r')"')
+
+    def mel_string(text):
+        return '"' + str(text).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    temp_path = f"{destination_path}.{os.getpid()}.tmp"
+    rewritten = 0
+
+    try:
+        with open(source_path, 'r', encoding='utf-8', errors='surrogateescape', newline='') as source, \
+                open(temp_path, 'w', encoding='utf-8', errors='surrogateescape', newline='') as destination:
+            for line in source:
+                body = line.rstrip('\r\n')
+                match = set_re.match(body)
+                if body.startswith('//Name: '):
+                    line = f"//Name: {os.path.basename(destination_path)}{line[len(body):]}"
+                elif match:
+                    line = f"{match.group('head')}{mel_string(values[match.group('name')])};{line[len(body):]}"
+                    rewritten += 1
+                elif any_re.match(body):
+                    raise ValueError(f"Can't rewrite attribute in {source_path}: {body.strip()}")
+                destination.write(line)
+        os.replace(temp_path, destination_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return rewritten
+
+
+def _strip_ma_parents(lines, ancestors, root, file_name):
+    """
+    Yield the lines of a .ma file without the given parents of root
+
+    Args:
+        lines: Lines of the exported .ma
+        ancestors (list): Parent names of root, top first (ej: ['asset'])
+        root (str): Exported group name (ej: 'geo')
+        file_name (str): Name written in the "//Name:" header
+    """
+
+    # Every spelling of the parents in front of root: "|asset|geo", "asset|geo"...
+    prefixes = ['|'.join(ancestors[i:]) for i in range(len(ancestors))]
+    prefix_re = re.compile(r'"(?P<full>\|)?(?:' + '|'.join(re.escape(p) for p in prefixes) + r')\|(?=' + re.escape(root) + r'[|."])')
+
+    def strip_prefix(text):
+        return prefix_re.sub(lambda m: '"|' if m.group('full') else '"', text)
+
+    # A parent referenced by itself ("asset.do", "|asset")
+    ancestor_paths = set()
+    for i in range(len(ancestors)):
+        ancestor_paths.add('|' + '|'.join(ancestors[:i + 1]))
+        for j in range(i + 1):
+            ancestor_paths.add('|'.join(ancestors[j:i + 1]))
+    ancestor_re = re.compile(r'"(?:' + '|'.join(re.escape(p) for p in sorted(ancestor_paths, key=len, reverse=True)) + r')(?:\.[^"]*)?"')
+    create_re = re.compile(r'^createNode \S+ -n "(?P<name>[^"]+)"(?: -p "(?P<parent>[^"]+)")?')
+
+    created = []  # full paths of the DAG nodes in the file, to resolve partial -p paths
+    ancestor_full = ['|' + '|'.join(ancestors[:i + 1]) for i in range(len(ancestors))]
+    parent_full = ancestor_full[-1]
+    skip_block = False
+
+    for line in lines:
+
+        # Indented lines belong to the last statement
+        if line[:1] in ('\t', ' '):
+            if not skip_block:
+                yield strip_prefix(line)
+            continue
+
+        skip_block = False
+
+        if line.startswith('//Name: '):
+            yield f"//Name: {file_name}\n"
+            continue
+
+        match = create_re.match(line)
+        if match:
+            parent = match.group('parent')
+            if parent and not parent.startswith('|'):
+                parent = next((path for path in reversed(created) if path.endswith('|' + parent)), '|' + parent)
+            full_path = f"{parent or ''}|{match.group('name')}"
+            created.append(full_path)
+
+            if full_path in ancestor_full:
+                skip_block = True
+                continue
+            if parent == parent_full:
+                yield line[:match.start('parent') - len(' -p "')] + line[match.end('parent') + 1:]
+                continue
+
+        elif line.startswith(('connectAttr ', 'relationship ', 'select ')) and ancestor_re.search(line):
+            # Connections to the parents (display layers, sets...)
+            skip_block = True
+            continue
+
+        yield strip_prefix(line)
+
@@ -0,0 +1,211 @@
+"""Fast content fingerprints of scene data, used to skip work when nothing changed"""
+import maya.cmds as mc
+import maya.api.OpenMaya as om2
+import maya.OpenMaya as om1
+import ctypes
+import hashlib
+import struct
+import numpy as np
+
+
+def anim_curves_hash(curves=None, hasher=None):
+    """
+    Hash every key of the given animCurves: time, value, tangent types and tangents,
+    plus the plugs each curve drives.
+
+    Args:
+        curves (list): animCurve nodes, all curves in the scene if None
+        hasher: Optional hashlib object to update instead of a new one
+
+    Returns:
+        str: Hex digest
+    """
+    hasher = hasher or hashlib.sha1()
+
+    if curves is None:
+        curves = mc.ls(type='animCurve') or []
+
+    for curve in sorted(curves):
+        selection = om2.MSelectionList()
+        selection.add(curve)
+        fn_curve = om2.MFnAnimCurve(selection.getDependNode(0))
+
+        plugs = mc.listConnections(f"{curve}.output", plugs=True, source=False, destination=True) or []
+        hasher.update(f"{curve}>{','.join(sorted(plugs))}|{fn_curve.numKeys}|{fn_curve.preInfinityType}|{fn_curve.postInfinityType};".encode())
+
+        keys = bytearray()
+        unitless = fn_curve.isUnitlessInput
+        for index in range(fn_curve.numKeys):
+            key_input = fn_curve.unitlessInput(index) if unitless else fn_curve.input(index).value
+            in_x, in_y = fn_curve.getTangentXY(index, True)
+            out_x, out_y = fn_curve.getTangentXY(index, False)
+            keys += struct.pack(
+                '<6d2i',
+                key_input, fn_curve.value(index),
+                in_x, in_y, out_x, out_y,
+                fn_curve.inTangentType(index), fn_curve.outTangentType(index))
+        hasher.update(bytes(keys))
+
+    return hasher.hexdigest()
+
+
+# Shapes geometry_hash can read, any other shape under the root means "no fingerprint"
+GEOMETRY_SHAPES = ('mesh', 'nurbsCurve')
+
+# Attributes written to the caches (exporters.export_alembic -attrPrefix), their values are hashed
+EXPORTED_ATTRIBUTE_PREFIXES = ('ai', 'GUS', 'lineWidth')
+
+# GUS attributes that change on every publish (see Publisher._add_attributes_to_meshes), never hashed
+VOLATILE_ATTRIBUTES = ('GUS_publish_time', 'GUS_source_scene', 'GUS_user_name')
+
+
+def _dag_path(node):
+    selection = om2.MSelectionList()
+    selection.add(node)
+    return selection.getDagPath(0)
+
+
+def _array(values, dtype):
+    """OpenMaya 2 number array (MIntArray, MFloatArray...) to numpy, iterated in C (np.array goes element by element in Python)"""
+    return np.fromiter(values, dtype=dtype, count=len(values))
+
+
+def _raw_floats(pointer, count):
+    """numpy view of count floats behind an OpenMaya 1 raw pointer (getRawPoints...), nothing is copied"""
+    return np.ctypeslib.as_array((ctypes.c_float * count).from_address(int(pointer)))
+
+
+def _hash_mesh(mesh, hasher):
+    fn_mesh = om2.MFnMesh(_dag_path(mesh))
+
+    # Topology
+    counts, vertex_ids = fn_mesh.getVertices()
+    hasher.update(_array(counts, np.int32).tobytes())
+    hasher.update(_array(vertex_ids, np.int32).tobytes())
+
+    # Points and normals (object space), read straight from the mesh data with OpenMaya 1
+    selection = om1.MSelectionList()
+    selection.add(mesh)
+    dag_path = om1.MDagPath()
+    selection.getDagPath(0, dag_path)
+    raw_mesh = om1.MFnMesh(dag_path)
+    hasher.update(_raw_floats(raw_mesh.getRawPoints(), raw_mesh.numVertices() * 3).tobytes())
+    hasher.update(_raw_floats(raw_mesh.getRawNormals(), raw_mesh.numNormals() * 3).tobytes())
+
+    # UV sets: values and per face assignment
+    for uv_set in fn_mesh.getUVSetNames():
+        u_values, v_values = fn_mesh.getUVs(uv_set)
+        uv_counts, uv_ids = fn_mesh.getAssignedUVs(uv_set)
+        hasher.update(f"uv:{uv_set};".encode())
+        hasher.update(_array(u_values, np.float32).tobytes())
+        hasher.update(_array(v_values, np.float32).tobytes())
+        hasher.update(_array(uv_counts, np.int32).tobytes())
+        hasher.update(_array(uv_ids, np.int32).tobytes())
+
+    # Creases (edges and vertices)
+    for get_creases in (fn_mesh.getCreaseEdges, fn_mesh.getCreaseVertices):
+        try:
+            crease_ids, crease_values = get_creases()
+        except RuntimeError:
+            continue  # no creases
+        hasher.update(_array(crease_ids, np.int32).tobytes())
+        hasher.update(_array(crease_values, np.float64).tobytes())
+
+    # Shading group names are written on the meshes (GUS_shading_grp)
+    shading_engines = mc.listConnections(mesh, type='shadingEngine', source=False, destination=True) or []
+    hasher.update(f"sg:{','.join(sorted(set(shading_engines)))};".encode())
+
+
+def _hash_exported_attributes(node, hasher):
+    """Values of the attributes that go into the caches with the geometry (EXPORTED_ATTRIBUTE_PREFIXES)"""
+    attributes = mc.listAttr(node, string=[f"{prefix}*" for prefix in EXPORTED_ATTRIBUTE_PREFIXES]) or []
+    for attribute in sorted(set(attributes) - set(VOLATILE_ATTRIBUTES)):
+        try:
+            hasher.update(f"{attribute}={mc.getAttr(f'{node}.{attribute}')};".encode())
+        except (RuntimeError, ValueError):
+            continue  # compound children of multis, message attributes...
+
+
+def geometry_hash(root, hasher=None):
+    """
+    Hash the geometry under a group: hierarchy names, local transforms and visibility,
+    per mesh its topology, object space points and normals, UV sets, creases and shading
+    group (read with OpenMaya arrays, no per vertex cmds calls), and the values of the
+    exported attributes of every node (ai*, GUS* but VOLATILE_ATTRIBUTES, lineWidth*).
+
+    Args:
+        root (str): Group to hash (ej: 'asset|geo')
+        hasher: Optional hashlib object to update instead of a new one
+
+    Returns:
+        str: Hex digest, None if root is missing or holds shapes not in GEOMETRY_SHAPES
+    """
+    hasher = hasher or hashlib.sha1()
+
+    root_long = (mc.ls(root, long=True) or [None])[0]
+    if not root_long:
+        return None
+
+    nodes = [root_long] + sorted(mc.listRelatives(root_long, allDescendents=True, fullPath=True) or [])
+
+    for node in nodes:
+        relative = node[len(root_long):] or '|'
+        node_type = mc.nodeType(node)
+
+        if mc.objectType(node, isAType='shape'):
+            if mc.getAttr(f"{node}.intermediateObject"):
+                continue
+            if node_type not in GEOMETRY_SHAPES:
+                return None
+
+            hasher.update(f"{node_type}:{relative};".encode())
+            if node_type == 'mesh':
+                _hash_mesh(node, hasher)
+            else:
+                hasher.update(np.array(mc.getAttr(f"{node}.cv[*]"), dtype=np.float64).tobytes())
+
+        else:
+            hasher.update(f"{node_type}:{relative}|{mc.getAttr(f'{node}.visibility')};".encode())
+            hasher.update(struct.pack('<16d', *mc.xform(node, query=True, matrix=True, objectSpace=True)))
+
+        _hash_exported_attributes(node, hasher)
+
+    return hasher.hexdigest()
+
+
+def animation_hash(root, frame_range=None, hasher=None):
+    """
+    Hash everything that moves a cached group: the animCurves in the history of its
+    shapes and of its parents (rig controls, constraints to other assets...), the
+    referenced file it comes from and the frame range.
+
+    Args:
+        root (str): Group to cache (ej: 'char01:geo')
+        frame_range (tuple): (start, end) of the cache
+        hasher: Optional hashlib object to update instead of a new one
+
+    Returns:
+        str: Hex digest, None if root is missing
+    """
+    hasher = hasher or hashlib.sha1()
+
+    root_long = (mc.ls(root, long=True) or [None])[0]
+    if not root_long:
+        return None
+
+    # Shapes are driven by deformers, the group by its parents' transforms (-worldSpace caches)
+    nodes = mc.listRelatives(root_long, allDescendents=True, fullPath=True, type='shape') or []
+    parent = root_long
+    while parent:
+        nodes.append(parent)
+        parent = (mc.listRelatives(parent, parent=True, fullPath=True) or [None])[0]
+
+    curves = mc.ls(mc.listHistory(nodes) or [], type='animCurve') or []
+
+    reference = ''
+    if mc.referenceQuery(root_long, isNodeReferenced=True):
+        reference = mc.referenceQuery(root_long, filename=True, withoutCopyNumber=True)
+
+    hasher.update(f"{root_long}|{reference}|{frame_range};".encode())
+
+    return anim_curves_hash(sorted(set(curves)), hasher=hasher)
@@ -0,0 +1,159 @@
+"""Publish manifests: size, mtime and blake2b checksum of every file of a version, and their verification
+
+Runs without Maya, a publish can be checked from any machine that sees the share:
+    python manifest.py /publish/path/asset_v003.manifest.json [--full]
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+
+MANIFEST_VERSION = 1
+
+# hashlib releases the GIL on big buffers, threads hash files in parallel
+MAX_WORKERS = min(8, os.cpu_count() or 4)
+
+
+def checksum(path):
+    """blake2b of a file, read through a memory map (no copies into Python buffers)"""
+    hasher = hashlib.blake2b(digest_size=32)
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hasher.update(mapped)
+
+    return hasher.hexdigest()
+
+
+def file_entry(path, known=None):
+    """
+    Manifest entry of a file. A known entry (ej: from a publish checkpoint) is reused
+    without reading the file when its size and mtime still match
+    """
+    stat = os.stat(path)
+    if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime:
+        return dict(known, path=path)
+
+    return {
+        'path': path,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'blake2b': checksum(path),
+    }
+
+
+def build_manifest(paths, workers=MAX_WORKERS, known=None):
+    """
+    Stat and checksum files in a thread pool
+
+    Args:
+        paths (list): Files to list (missing files are skipped)
+        workers (int): Files hashed at the same time
+        known (dict): {path: entry} already hashed, see file_entry
+
+    Returns:
+        dict: {'manifest_version', 'created', 'files': [{'path', 'size', 'mtime', 'blake2b'}]}
+    """
+    paths = [path for path in dict.fromkeys(paths) if path and os.path.isfile(path)]
+    known = known or {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        files = list(pool.map(lambda path: file_entry(path, known.get(path)), paths))
+
+    return {
+        'manifest_version': MANIFEST_VERSION,
+        'created': time.time(),
+        'files': files,
+    }
+
+
+def write_manifest(manifest_path, paths, extra=None, workers=MAX_WORKERS, known=None):
+    """
+    Build the manifest of paths and write it as json (atomic rename)
+
+    Args:
+        manifest_path (str): Destination .json
+        paths (list): Files of the publish
+        extra (dict): Additional keys (version, user...)
+        known (dict): {path: entry} already hashed, see file_entry
+
+    Returns:
+        dict: Written manifest
+    """
+    manifest = build_manifest(paths, workers=workers, known=known)
+    manifest.update(extra or {})
+
+    directory = os.path.dirname(manifest_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(temp_path, manifest_path)
+
+    return manifest
+
+
+def read_manifest(manifest_path):
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+
+def _verify_entry(entry, full):
+    path = entry['path']
+    if not os.path.isfile(path):
+        return 'missing'
+
+    stat = os.stat(path)
+    if stat.st_size != entry['size']:
+        return 'changed'
+
+    # Same size and mtime is trusted unless full, only touched files are read again
+    if not full and stat.st_mtime == entry['mtime']:
+        return 'ok'
+
+    return 'ok' if checksum(path) == entry['blake2b'] else 'changed'
+
+
+def verify(manifest_path, full=False, workers=MAX_WORKERS):
+    """
+    Check the files of a manifest. Incremental by default: a file with the recorded
+    size and mtime is not read, any other file is hashed again.
+
+    Args:
+        manifest_path (str): Manifest .json
+        full (bool): Hash every file
+
+    Returns:
+        dict: {'ok': [paths], 'changed': [paths], 'missing': [paths]}
+    """
+    manifest = read_manifest(manifest_path)
+    entries = manifest.get('files', [])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        states = list(pool.map(lambda entry: _verify_entry(entry, full), entries))
+
+    report = {'ok': [], 'changed': [], 'missing': []}
+    for entry, state in zip(entries, states):
+        report[state].append(entry['path'])
+
+    for state in ('changed', 'missing'):
+        for path in report[state]:
+            print(f"❌ {state.upper()}: {path}")
+    print(f"{'✓' if len(report['ok']) == len(entries) else '⚠'} {len(report['ok'])}/{len(entries)} files verified: {manifest_path}")
+
+    return report
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: manifest.py <manifest.json> [--full]")
+        sys.exit(2)
+    result = verify(sys.argv[1], full='--full' in sys.argv[2:])
+    sys.exit(0 if not result['changed'] and not result['missing'] else 1)
@@ -5,17 +5,43 @@ import os
 import datetime
 from . import exporters
 from . import version as version_core
+from . import upload_queue
+from . import workspace
+from . import transfer
+from . import fingerprint
+from . import manifest
+from . import checkpoint
 from ..utils import add_attributes
 import importlib
 importlib.reload(exporters)
+importlib.reload(upload_queue)
+importlib.reload(workspace)
+importlib.reload(transfer)
+importlib.reload(fingerprint)
+importlib.reload(manifest)
+importlib.reload(checkpoint)
 importlib.reload(version_core)
 importlib.reload(add_attributes)
 
 
+# PublishedFile text field holding the geometry fingerprint of the artifact. Custom field, create
+# it on the site (Text, "Fingerprint"); without it fingerprints are not stored nor reused
+FINGERPRINT_FIELD = 'sg_fingerprint'
+
+# Artifacts copied from the previous publish when the geometry fingerprint matches, per task.
+# Files that also carry materials (.ma asset, USD, ASS) are only reused on Model publishes,
+# a Shading publish with the same geometry still needs its new shaders in them.
+# Every artifact carries the GUS publish info of its version on the meshes: the .ma asset is
+# copied with it rewritten (ascii only), alembic caches can't be rewritten and are always exported
+REUSE_UNCHANGED_GEOMETRY = {
+    'Model': ('maya_asset_clean_publish',),
+}
+
+
 class Publisher:
     """Handles publishing logic without UI"""
 
-    def __init__(self, context, current_version, description=None, asset_type=None, use_playblast=False, media_folder=None, log_callback=None, engine=None, sg=None, tk=None):
+    def __init__(self, context, current_version, description=None, asset_type=None, use_playblast=False, media_folder=None, log_callback=None, engine=None, sg=None, tk=None, background_upload=True, draft_playblast=False, stage_locally=False, resume=False, streaming_playblast=False):
 
         if sg and tk:
             # Get APIs from constructor if passed
@@ -40,10 +66,23 @@ class Publisher:
         self.use_playblast = use_playblast
         self.media_folder = media_folder
         self.asset_type = asset_type
+        self.background_upload = background_upload
+        self.draft_playblast = draft_playblast
+        self.streaming_playblast = streaming_playblast
+        self.stage_locally = stage_locally
+        self.resume = resume
+        self.checkpoint = None
+        self.transfers = None
+        self.staged_files = {}
         self.asset_info = {}
+        self.workspace = None
+        self.geometry_fingerprints = {}
+        self.has_fingerprint_field = None
         self.results = {
             'version': None,
             'published_files': [],
+            'review_media': {},
+            'reused_files': [],
             'errors': []
         }
 
@@ -62,6 +101,39 @@ class Publisher:
 
     def publish(self):
 
+        # Checkpoint journal of this work scene: completed steps are kept if the publish
+        # fails, and skipped when it runs again with resume=True
+        work_file = mc.file(query=True, sceneName=True)
+        self.checkpoint = checkpoint.PublishCheckpoint(work_file, resume=self.resume)
+
+        # Scratch folder of this publish only (captures, encodes, concat lists...),
+        # parallel publishes on the same workstation never share temp files
+        with workspace.Workspace('publish', min_free_bytes=self._scratch_estimate()) as self.workspace:
+            self.log(f"Workspace: {self.workspace.path}")
+
+            # Staging: exporters write to the local workspace, a TransferEngine moves the files
+            # to the publish tree in parallel (Maya never writes to the share)
+            self.transfers = transfer.TransferEngine(move=False) if self.stage_locally else None
+            try:
+                self._publish()
+            except Exception:
+                # Exporters rename the open scene (publish scene, shaders...), give it back
+                # its work name so the publish can be resumed from the same scene
+                mc.file(rename=work_file)
+                self.log(f"Publish failed, {len(self.checkpoint.data['steps'])} completed steps kept: publish again with resume to continue")
+                raise
+            finally:
+                if self.transfers:
+                    self.transfers.close()
+                # Staged outputs are hashed from the workspace, finish before it is removed
+                self.checkpoint.flush()
+
+        self.checkpoint.clear()
+
+        return self.results
+
+    def _publish(self):
+
         ##################
         # Create Version #
         ##################
@@ -100,16 +172,31 @@ class Publisher:
         # Get User description
         description_with_work_path = f"{self.description} - (Published from {self.file_name})"
 
+        # Resume: reuse the Version of the failed publish
+        self.version = None
+        if self.checkpoint.version:
+            self.version = self.sg.find_one('Version', [['id', 'is', self.checkpoint.version['id']]], ['code', 'entity', 'sg_task', 'project'])
+            if self.version:
+                self.log(f"✓ Resuming Version: {self.version['code']} ({len(self.checkpoint.data['steps'])} steps done)\n")
+            else:
+                self.log("WARNING: Version of the failed publish no longer exists, publishing everything again\n")
+                self.checkpoint.reset()
+
         # Create version on SG
-        self.version = version_core.create_version(self.context, self.version_name, description_with_work_path, sg=self.sg)
-        self.results['version'] = self.version
+        if not self.version:
+            self.version = version_core.create_version(self.context, self.version_name, description_with_work_path, sg=self.sg)
+            self.checkpoint.set_version(self.version)
+            self.log(f"✓ Version created: {self.version['code']}\n")
 
-        self.log(f"✓ Version created: {self.version['code']}\n")
+        self.results['version'] = self.version
 
         ##########################
         # Export published files #
         ##########################
 
+        # Exporters run inside an ExportSession (no refresh, no undo...), keep their times
+        exporters.export_session.timings.clear()
+
         # Export for Model Task
         if self.context.task['name'] == 'Model':
 
@@ -118,9 +205,9 @@ class Publisher:
                 # Add attributes on each mesh
                 self._add_attributes_to_meshes()
                 # Export geo grp as alembic cache
-                self._publish_alembic(1001, 1001)
+                self._run_step('alembic', self._publish_alembic, 1001, 1001)
                 # Export geo grp as maya .ma
-                self._publish_maya_asset()
+                self._run_step('maya_asset', self._publish_maya_asset)
 
         # Export for Shading Task
         elif self.context.task['name'] == 'Shading':
@@ -128,16 +215,16 @@ class Publisher:
             # Add attributes on each mesh
             self._add_attributes_to_meshes()
             # Export geo grp as alembic cache
-            self._publish_alembic(1001, 1001)
+            self._run_step('alembic', self._publish_alembic, 1001, 1001)
             # Export geo grp as maya .ma
-            self._publish_maya_asset()
+            self._run_step('maya_asset', self._publish_maya_asset)
             # Export shader and textures
-            self._publish_shaders()
+            self._run_step('shaders', self._publish_shaders)
             # Export USD
-            self._publish_usd()
+            self._run_step('usd', self._publish_usd)
             # Export asset as .ass geo + shaders(for elements, not props or characters)
             if self.asset_type == 'ELEM':
-                self._publish_Ass()
+                self._run_step('ass', self._publish_Ass)
 
         # Export for Grooming Task cacacaca
         elif self.context.task['name'] == 'Groom':
@@ -145,11 +232,11 @@ class Publisher:
             # self._publish_alembic(1001, 1001)
 
             # Export geo grp and hair grp as maya .ma(groom dpt debe guardar el pelo IGS en un grupo llamado HAIR, se exportan los dos grupos como .ma)
-            self._publish_maya_asset()
+            self._run_step('maya_asset', self._publish_maya_asset)
             # Export hair as .xgip(se crea un xgip a partir del pelo que haya dentro del grupo HAIR)
 
             # Export hair shader(se exporta el shader igual que en shading)
-            self._publish_shaders() # Exporta el shader usando la funcion export_shader_and_textures_for_hair, no la normal
+            self._run_step('shaders', self._publish_shaders) # Exporta el shader usando la funcion export_shader_and_textures_for_hair, no la normal
 
         # LAYOUT
         elif self.context.task['name'] == 'Layout':
@@ -178,54 +265,24 @@ class Publisher:
         # Export maya publish scene as backup #
         #######################################
 
-        self._publish_maya_scene()
+        self._run_step('maya_scene', self._publish_maya_scene, result_keys=('publish_scene',))
+
+        self.results['export_timings'] = list(exporters.export_session.timings)
+        for label, seconds in self.results['export_timings']:
+            self.log(f"⏱ {label}: {seconds:.2f}s")
 
         ################
         # Export Movie #
         ################
 
-        from ..media import playblast_tool
-
-        # Playblast
-        if self.use_playblast:
-
-            self.log("Capturing playblast ---------------\n")
-            self.log(self.version_movie_path)
-
-            if self.context.step['name'] == 'Layout':  # if we are in layout, we need to publish full sequence, unless we are on a shot TEMP-----------------------------------------------------------
-
-                output_video = playblast_tool.create_sequence_playblast(self.version_movie_path)
-
-            else:
-
-                output_video = playblast_tool.create_playblast(self.version_movie_path) # in every other case, we just need a playblast from the shot, plabackOptions define frame range
-
-            self.log(f"OUTPUT_VIDEO - {os.path.exists(output_video)} --> {output_video}\n")
-
-            if output_video:
-
-                self.log("Uploading video ---------------\n")
-
-                version_core.upload_video(self.version['id'], output_video)
-
-                self.log("✓ Video Thumbnail Uploaded\n")
-
-        # Render
-        else:
-
-            try:
-                self.log("Creating movie from folder images...")
+        self._run_step('movie', self._publish_movie, result_keys=('review_media', 'shot_movies', 'thumbnail', 'uploads', 'media_files'))
 
-                output_video = playblast_tool.create_movie_from_folder(self.media_folder, output_path=self.version_movie_path)
-                if output_video:
-
-                    self.log("Uploading video...")
+        ###################
+        # Publish Manifest #
+        ###################
 
-                    version_core.upload_video(self.version['id'], output_video)
-
-                    self.log("✓ Video Thumbnail Uploaded\n")
-            except:
-                output_video = False
+        self._wait_transfers()
+        self._write_manifest()
 
         ####################
         # Version up Scene #
@@ -235,8 +292,18 @@ class Publisher:
 
         new_file = self.scene_work_template.apply_fields(self.scene_fields)
 
-        mc.file(rename=new_file)
-        mc.file(save=True)
+        # The publish scene was just saved from this same scene: copy its bytes instead of
+        # writing the whole scene again (only if nothing changed since and the format matches)
+        publish_scene = self.results.get('publish_scene')
+        if (publish_scene and os.path.exists(self.staged_files.get(publish_scene, publish_scene))
+                and not mc.file(query=True, modified=True)
+                and os.path.splitext(publish_scene)[1] == os.path.splitext(new_file)[1]):
+            transfer.copy_file(self.staged_files.get(publish_scene, publish_scene), new_file)
+            mc.file(rename=new_file)
+            mc.file(modified=False)
+        else:
+            mc.file(rename=new_file)
+            mc.file(save=True)
 
         self.log(f"Saved work scene as {new_file}\n")
 
@@ -250,18 +317,24 @@ class Publisher:
 
         # Export current work scene as publish maya scene
         if self.context.entity['type'].lower() == "asset":
-            template = self.tk.templates["maya_asset_publish"]
+            template_name = "maya_asset_publish"
         else:
-            template = self.tk.templates["maya_shot_publish"]
+            template_name = "maya_shot_publish"
+        template = self.tk.templates[template_name]
 
-        ma_path = template.apply_fields(self.scene_fields)
+        # ma or mb, see exporters.SCENE_FORMATS
+        file_type = exporters.get_scene_format(template_name, self.context.step['name'])
+        ma_path = exporters.scene_format_path(template.apply_fields(self.scene_fields), file_type)
 
         # Export
-        exporters.export_maya_scene(ma_path)
+        output_path = self._get_output_path(ma_path)
+        exporters.export_maya_scene(output_path, file_type)
+        self._deliver(output_path, ma_path)
 
         # Register Publish
         self._register_publish_to_version(self.context, ma_path, self.scene_fields["version"], "Maya Scene", version_entity=self.version)
         self.results['published_files'].append(ma_path)
+        self.results['publish_scene'] = ma_path
 
         self.log("Maya Scene Published!!\n")
 
@@ -271,7 +344,8 @@ class Publisher:
 
         # Export current work scene as publish maya scene
         template = self.tk.templates["maya_asset_clean_publish"]
-        ma_asset_path = template.apply_fields(self.scene_fields)
+        file_type = exporters.get_scene_format("maya_asset_clean_publish", self.context.step['name'])
+        ma_asset_path = exporters.scene_format_path(template.apply_fields(self.scene_fields), file_type)
 
         # Create folder if needed
         if not os.path.exists(os.path.dirname(ma_asset_path)):
@@ -287,11 +361,15 @@ class Publisher:
         else:
             ma_export_object = f"{self.context.entity['name']}|geo"
 
-        # Export
-        exporters.export_maya_asset(ma_export_object, ma_asset_path)
+        # Export (or reuse the previous one if the geometry did not change, see REUSE_UNCHANGED_GEOMETRY)
+        geometry_fingerprint = self._get_geometry_fingerprint(ma_export_object, file_type)
+        if not self._reuse_previous_publish("maya_asset_clean_publish", "Maya Scene", geometry_fingerprint, ma_asset_path):
+            output_path = self._get_output_path(ma_asset_path)
+            exporters.export_maya_asset(ma_export_object, output_path, file_type)
+            self._deliver(output_path, ma_asset_path)
 
         # Register Publish
-        self._register_publish_to_version(self.context, ma_asset_path, self.scene_fields["version"], "Maya Scene", version_entity=self.version)
+        self._register_publish_to_version(self.context, ma_asset_path, self.scene_fields["version"], "Maya Scene", version_entity=self.version, extra_info=self._fingerprint_info(geometry_fingerprint))
         self.results['published_files'].append(ma_asset_path)
 
         self.log("✓ Maya Asset Published!!\n")
@@ -311,11 +389,15 @@ class Publisher:
         else: 
             abc_export_object = f"{self.context.entity['name']}|geo"
 
-        # Export
-        exporters.export_alembic(abc_export_object, abc_path, frameIn, frameOut)
+        # Export (or reuse the previous one if the geometry did not change, see REUSE_UNCHANGED_GEOMETRY)
+        geometry_fingerprint = self._get_geometry_fingerprint(abc_export_object, f"abc {frameIn} {frameOut}")
+        if not self._reuse_previous_publish("asset_alembic_cache", "Alembic Cache", geometry_fingerprint, abc_path):
+            output_path = self._get_output_path(abc_path)
+            exporters.export_alembic(abc_export_object, output_path, frameIn, frameOut)
+            self._deliver(output_path, abc_path)
 
         # Register Publish
-        self._register_publish_to_version(self.context, abc_path, self.scene_fields["version"], "Alembic Cache", version_entity=self.version)
+        self._register_publish_to_version(self.context, abc_path, self.scene_fields["version"], "Alembic Cache", version_entity=self.version, extra_info=self._fingerprint_info(geometry_fingerprint))
         self.results['published_files'].append(abc_path)
 
         self.log("✓ Alembic Geo Published!!\n")
@@ -335,7 +417,9 @@ class Publisher:
         self.log(f"Exported ass: {assPath}")
 
         # Export
-        exporters.export_ass(f"{self.context.entity['name']}|geo", assPath)
+        output_path = self._get_output_path(assPath)
+        exporters.export_ass(f"{self.context.entity['name']}|geo", output_path)
+        self._deliver(output_path, assPath)
 
         # Register Publish
         self._register_publish_to_version(self.context, assPath, self.scene_fields["version"], "ASS Cache", version_entity=self.version)
@@ -349,7 +433,8 @@ class Publisher:
 
         # Get shaders export path
         template = self.tk.templates["maya_asset_shader_publish"]
-        shaders_path = template.apply_fields(self.scene_fields)
+        file_type = exporters.get_scene_format("maya_asset_shader_publish", self.context.step['name'])
+        shaders_path = exporters.scene_format_path(template.apply_fields(self.scene_fields), file_type)
 
         # Generate textures export folder
         template = self.tk.templates["texture_folder_publish"]
@@ -357,10 +442,12 @@ class Publisher:
 
         # Export
 
+        output_path = self._get_output_path(shaders_path)
         if self.context.task['name'] == 'Grooming':
-            shaders_scene_path, textures_dict = exporters.export_shaders_and_textures_for_hair(self.context.entity['name'], shaders_path, textures_export_folder)
+            shaders_scene_path, textures_dict = exporters.export_shaders_and_textures_for_hair(self.context.entity['name'], output_path, textures_export_folder, file_type)
         else:
-            shaders_scene_path, textures_dict = exporters.export_shaders_and_textures(self.context.entity['name'], shaders_path, textures_export_folder)
+            shaders_scene_path, textures_dict = exporters.export_shaders_and_textures(self.context.entity['name'], output_path, textures_export_folder, file_type)
+        shaders_scene_path = self._deliver(shaders_scene_path, shaders_path)
 
         # Register Publish
         self._register_publish_to_version(self.context, shaders_scene_path, self.scene_fields["version"], "Maya Shaders", version_entity=self.version, extra_info={"sg_textures": str(textures_dict)})
@@ -376,21 +463,333 @@ class Publisher:
         template = self.tk.templates["maya_asset_scene_usd_publish"]
         usd_path = template.apply_fields(self.scene_fields)
 
-        success = exporters.export_usd(usd_path)
+        output_path = self._get_output_path(usd_path)
+        if not exporters.export_usd(output_path):
+            # Raise so the step is not checkpointed as done, a resume exports it again
+            self.log(f"❌ ERROR: USD not exported...")
+            raise RuntimeError(f"USD export failed: {usd_path}")
+        self._deliver(output_path, usd_path)
 
-        if success:
-            # Register Publish
-            self._register_publish_to_version(self.context, usd_path, self.scene_fields["version"], "Usda File", version_entity=self.version)
-            self.results['published_files'].append(usd_path)
+        # Register Publish
+        self._register_publish_to_version(self.context, usd_path, self.scene_fields["version"], "Usda File", version_entity=self.version)
+        self.results['published_files'].append(usd_path)
 
-            self.log("✓ USD Published!!\n")
-        else:
-            self.log(f"❌ ERROR: USD not exported...")
+        self.log("✓ USD Published!!\n")
 
     ########################
     # UTILS ################
     ########################
 
+    def _publish_movie(self):
+        """
+        Playblast (or folder movie) of the version and its upload
+
+        Returns:
+            list: Media files written (movie, proxy, web, poster, shot movies)
+        """
+
+        from ..media import playblast_tool
+
+        # Playblast
+        if self.use_playblast:
+
+            self.log("Capturing playblast ---------------\n")
+            self.log(self.version_movie_path)
+
+            # Encoding profile depends on task step (fast for dailies, slow for finals)
+            profile = playblast_tool.get_step_profile(self.context.step['name'])
+
+            # Draft: reduced capture and encode for blocking dailies
+            capture_options = None
+            if self.draft_playblast:
+                from ..media import capture
+                capture_options = capture.DRAFT_OPTIONS
+                profile = 'draft'
+
+            if self.context.step['name'] == 'Layout':  # if we are in layout, we need to publish full sequence, unless we are on a shot TEMP-----------------------------------------------------------
+
+                # one capture gives the sequence movie and every shot movie (stream copies)
+                sequence_review = playblast_tool.create_sequence_review(self.version_movie_path, profile=profile)
+                self.results['shot_movies'] = sequence_review.get('shots', {})
+                output_video = sequence_review.get('movie')
+
+                for shot_name, shot_movie in self.results['shot_movies'].items():
+                    self.log(f"✓ Shot movie {shot_name}: {shot_movie}")
+
+            else:
+
+                # in every other case, we just need a playblast from the shot, plabackOptions define frame range
+                # movie, proxy, web mp4 and poster come from the same capture and decode
+                # poster frame goes to SG right after capture, before the encode
+                review_media = playblast_tool.create_review_media(self.version_movie_path, profile=profile, on_poster=self._upload_poster, capture_options=capture_options, streaming=self.streaming_playblast)
+                self.results['review_media'] = review_media
+                output_video = review_media.get('movie')
+
+            self.log(f"OUTPUT_VIDEO - {bool(output_video) and os.path.exists(output_video)} --> {output_video}\n")
+
+            if output_video:
+
+                self.log("Uploading video ---------------\n")
+
+                thumbnail = None if self.results.get('thumbnail') else self.results['review_media'].get('poster')
+                self._upload_video(output_video, thumbnail=thumbnail)
+
+        # Render
+        else:
+
+            try:
+                self.log("Creating movie from folder images...")
+
+                output_video = playblast_tool.create_movie_from_folder(self.media_folder, output_path=self.version_movie_path, on_poster=self._upload_poster)
+                if output_video:
+
+                    self.log("Uploading video...")
+
+                    self._upload_video(output_video)
+            except:
+                output_video = False
+
+        media = [output_video] + [path for path in self.results['review_media'].values() if isinstance(path, str)]
+        media += list(self.results.get('shot_movies', {}).values())
+        self.results['media_files'] = [path for path in dict.fromkeys(media) if path and os.path.exists(path)]
+
+        return self.results['media_files']
+
+    def _scratch_estimate(self):
+        """
+        Scratch space the planned outputs of this publish need: the viewport capture
+        and, when staging locally, the exports (twice the work scene, rough)
+
+        Returns:
+            int: Bytes, or None to only warn on the generic threshold (workspace.MIN_FREE_BYTES)
+        """
+        needed = 0
+
+        if self.use_playblast and not self.streaming_playblast:
+            if self.context.step['name'] == 'Layout':
+                seq_manager = mc.sequenceManager(q=True, node=True)
+                sequencer = mc.listConnections(seq_manager, type='sequencer')[0]
+                frame_count = mc.getAttr(sequencer + '.maxFrame') - mc.getAttr(sequencer + '.minFrame') + 1
+                needed += workspace.estimate_capture_bytes(frame_count, 1280, 720)
+            else:
+                from ..media import capture
+                options = capture.DRAFT_OPTIONS if self.draft_playblast else {}
+                scale = options.get('percent', 100) / 100
+                frame_count = mc.playbackOptions(query=True, maxTime=True) - mc.playbackOptions(query=True, minTime=True) + 1
+                needed += workspace.estimate_capture_bytes(frame_count, 1920 * scale, 1080 * scale, options.get('image_format', 'png'))
+
+        work_file = mc.file(query=True, sceneName=True)
+        if self.stage_locally and work_file and os.path.exists(work_file):
+            needed += 2 * os.path.getsize(work_file)
+
+        return needed or None
+
+    def _upload_poster(self, poster_path):
+        """Upload the poster frame as Version thumbnail right away (the movie comes later)"""
+
+        try:
+            version_core.upload_thumbnail(self.version['id'], poster_path)
+            self.results['thumbnail'] = poster_path
+            self.log("✓ Thumbnail Uploaded\n")
+        except Exception as e:
+            # Not fatal, the poster of the encode is queued with the movie instead
+            self.log(f"WARNING: Thumbnail upload failed, will retry with the movie: {e}\n")
+
+    def _upload_video(self, video_path, thumbnail=None):
+        """Upload movie (and thumbnail) to the Version, queued in background unless disabled"""
+
+        if self.background_upload:
+            # Files are on disk, the queue drains uploads after the publish ends
+            self.results['uploads'] = self.results.get('uploads', [])
+            if thumbnail:
+                self.results['uploads'].append(version_core.queue_thumbnail_upload(self.version['id'], thumbnail))
+            self.results['uploads'].append(version_core.queue_video_upload(self.version['id'], video_path))
+            self.log("✓ Video queued for upload\n")
+            return
+
+        if thumbnail:
+            version_core.upload_thumbnail(self.version['id'], thumbnail)
+        version_core.upload_video(self.version['id'], video_path)
+        self.log("✓ Video Thumbnail Uploaded\n")
+
+    def _get_geometry_fingerprint(self, export_object, salt=''):
+        """
+        Geometry fingerprint of an export object (see fingerprint.geometry_hash), computed
+        once per publish. salt separates artifacts with other settings (frame range, format)
+
+        Returns:
+            str: Hex digest or None if the geometry can't be fingerprinted (or stored)
+        """
+        if not self._fingerprint_field_exists():
+            return None
+
+        if export_object not in self.geometry_fingerprints:
+            self.geometry_fingerprints[export_object] = fingerprint.geometry_hash(export_object)
+
+        geometry_hash = self.geometry_fingerprints[export_object]
+        if not geometry_hash:
+            return None
+
+        return f"{geometry_hash}:{salt}" if salt else geometry_hash
+
+    def _fingerprint_field_exists(self):
+        """True if the site has FINGERPRINT_FIELD on PublishedFile (schema read once per publish)"""
+        if self.has_fingerprint_field is None:
+            try:
+                self.sg.schema_field_read('PublishedFile', FINGERPRINT_FIELD)
+                self.has_fingerprint_field = True
+            except Exception:
+                self.has_fingerprint_field = False
+                self.log(f"WARNING: PublishedFile has no {FINGERPRINT_FIELD} field, geometry fingerprints are not stored nor reused\n")
+        return self.has_fingerprint_field
+
+    def _fingerprint_info(self, geometry_fingerprint):
+        """PublishedFile fields for a fingerprint (None if there is nothing to store)"""
+        return {FINGERPRINT_FIELD: geometry_fingerprint} if geometry_fingerprint else None
+
+    def _reuse_previous_publish(self, template_name, file_type, geometry_fingerprint, publish_path):
+        """
+        Copy the last published file of this artifact if it was exported from the
+        same geometry, instead of exporting it again. The GUS publish info of the
+        meshes (fingerprint.VOLATILE_ATTRIBUTES) is rewritten with this publish's,
+        so only .ma files can be reused.
+
+        Args:
+            template_name (str): Artifact template, must be in REUSE_UNCHANGED_GEOMETRY for this task
+            file_type (str): Published file type (e.g., "Alembic Cache")
+            geometry_fingerprint (str): Fingerprint of the geometry to export now
+            publish_path (str): Path of the new publish
+
+        Returns:
+            bool: True if publish_path now holds the previous file
+        """
+
+        if not geometry_fingerprint or template_name not in REUSE_UNCHANGED_GEOMETRY.get(self.context.task['name'], ()):
+            return False
+
+        template = self.tk.templates[template_name]
+
+        try:
+            previous_publishes = self.sg.find(
+                'PublishedFile',
+                [['entity', 'is', self.context.entity],
+                 ['task', 'is', self.context.task],
+                 ['published_file_type.PublishedFileType.code', 'is', file_type],
+                 [FINGERPRINT_FIELD, 'is', geometry_fingerprint]],
+                ['path', 'version_number'],
+                order=[{'field_name': 'version_number', 'direction': 'desc'}])
+        except Exception as e:
+            self.log(f"WARNING: Can't look for previous publishes ({e}), exporting\n")
+            return False
+
+        if os.path.splitext(publish_path)[1] != '.ma':
+            return False
+
+        publish_info = {key: value for key, value in self.asset_info.items() if key in fingerprint.VOLATILE_ATTRIBUTES}
+
+        for previous in previous_publishes:
+            previous_path = (previous.get('path') or {}).get('local_path')
+            if (not previous_path or not os.path.exists(previous_path) or previous_path == publish_path
+                    or os.path.splitext(previous_path)[1] != '.ma'):
+                continue
+            # Same artifact
+            if not template.validate(previous_path):
+                continue
+
+            try:
+                rewritten = exporters.copy_ma_with_string_attributes(previous_path, publish_path, publish_info)
+            except (OSError, ValueError) as e:
+                self.log(f"WARNING: Can't reuse {previous_path} ({e}), exporting\n")
+                return False
+            if publish_info and not rewritten:
+                self.log(f"WARNING: No publish info in {previous_path}, exporting\n")
+                return False
+
+            self.results['reused_files'].append(publish_path)
+            self.log(f"✓ Geometry unchanged since v{previous['version_number']:03d}, reused {previous_path} (publish info rewritten)")
+            return True
+
+        return False
+
+    def _run_step(self, step, func, *args, result_keys=()):
+        """
+        Run a publish step and record it in the checkpoint. On resume, a step already
+        done whose outputs are intact is skipped and its results restored.
+
+        Args:
+            step (str): Checkpoint name of the step
+            func (callable): Step method, may return extra output files (media...).
+                It must raise if it fails, anything it returns is recorded as done
+            result_keys (tuple): self.results keys the step sets
+        """
+
+        if self.resume and self.checkpoint.is_done(step):
+            saved = self.checkpoint.get_step(step)['results']
+            self.results['published_files'].extend(saved.get('published_files', []))
+            self.results.update({key: value for key, value in saved.items() if key != 'published_files'})
+            self.log(f"✓ {step} already published, skipped (resume)\n")
+            return
+
+        published_before = len(self.results['published_files'])
+        extra_outputs = func(*args) or []
+
+        published = self.results['published_files'][published_before:]
+        results = {key: self.results[key] for key in result_keys if key in self.results}
+        results['published_files'] = published
+        self.checkpoint.done(step, published + list(extra_outputs), results=results, sources=self.staged_files)
+
+    def _get_output_path(self, publish_path):
+        """Path an exporter writes to: publish_path, or a local staging path with stage_locally"""
+        if not self.transfers:
+            return publish_path
+        staging_dir = self.workspace.subdir(os.path.join('staging', str(len(self.staged_files))))
+        return os.path.join(staging_dir, os.path.basename(publish_path))
+
+    def _deliver(self, output_path, publish_path):
+        """
+        Queue a staged export for transfer to its publish path (no-op without staging).
+        The file appears there complete, with an atomic rename
+
+        Returns:
+            str: publish_path
+        """
+        if self.transfers and output_path != publish_path:
+            self.staged_files[publish_path] = output_path
+            self.transfers.submit(output_path, publish_path)
+        return publish_path
+
+    def _wait_transfers(self):
+        """Block until every staged file is in the publish tree (raises the first transfer error)"""
+        if self.transfers and self.staged_files:
+            self.log(f"Waiting for {len(self.staged_files)} staged files to reach the publish tree...")
+            self.transfers.wait()
+            self.log("✓ Staged files transferred\n")
+
+    def _write_manifest(self):
+        """
+        Write <version>.manifest.json next to the publish scene: size, mtime and blake2b
+        of every published file and review movie (check it later with manifest.verify)
+        """
+
+        files = self.results['published_files'] + self.results.get('media_files', [])
+
+        manifest_path = os.path.join(os.path.dirname(self.results['publish_scene']), f"{self.version_name}.manifest.json")
+
+        try:
+            written = manifest.write_manifest(manifest_path, files, known=self.checkpoint.entries(), extra={
+                'version': self.version['code'],
+                'version_id': self.version['id'],
+                'task': self.context.task['name'],
+            })
+        except Exception as e:
+            self.log(f"WARNING: Can't write publish manifest: {e}\n")
+            return None
+
+        self.results['manifest'] = manifest_path
+        self.log(f"✓ Manifest ({len(written['files'])} files): {manifest_path}\n")
+
+        return manifest_path
+
     def _add_attributes_to_meshes(self):
 
         # This info is general for all meshes
@@ -0,0 +1,251 @@
+"""Fast file copies: reflink or in-kernel copy where the OS has it, atomic rename into place,
+and a transfer engine that moves staged publish files to the share in parallel"""
+import os
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Buffer for the plain copy fallback (Windows, SMB shares...)
+BUFFER_SIZE = 16 * 1024 * 1024
+
+# Copies are done in chunks this big
+CHUNK_SIZE = 64 * 1024 * 1024
+
+# Chunk of a copy under a bandwidth cap, small so the cap is smooth and not in 64 MB bursts
+LIMITED_CHUNK_SIZE = 2 * 1024 * 1024
+
+# Files copied at the same time by a TransferEngine
+TRANSFER_WORKERS = int(os.environ.get('WKND_TRANSFER_WORKERS', 4))
+
+# Bandwidth cap of a TransferEngine in MB/s (shared by all its copies), 0 for none
+BANDWIDTH_LIMIT = float(os.environ.get('WKND_TRANSFER_MBPS', 0))
+
+# Linux FICLONE ioctl: share the blocks on btrfs/xfs, nothing is copied
+_FICLONE = 0x40049409
+
+
+def _reflink(source_file, destination_file):
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(destination_file.fileno(), _FICLONE, source_file.fileno())
+        return True
+    except OSError:
+        return False
+
+
+class RateLimiter:
+    """Token bucket shared by several copy threads (bytes per second)"""
+
+    def __init__(self, bytes_per_second):
+        self.rate = bytes_per_second
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def consume(self, count):
+        """Block until count bytes fit in the rate"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next, now)
+            self._next = start + count / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+
+def _copy_file_range(source_file, destination_file, size, limiter=None):
+    """In-kernel copy (server side on NFS 4.2 / SMB3 shares). False if not supported"""
+    if not hasattr(os, 'copy_file_range'):
+        return False
+
+    chunk_size = LIMITED_CHUNK_SIZE if limiter else CHUNK_SIZE
+    copied = 0
+    try:
+        while copied < size:
+            # Wait for the bandwidth before copying, not after
+            count = min(chunk_size, size - copied)
+            if limiter:
+                limiter.consume(count)
+            count = os.copy_file_range(source_file.fileno(), destination_file.fileno(), count)
+            if count == 0:
+                break
+            copied += count
+    except OSError:
+        if copied:
+            raise
+        return False
+
+    return copied == size
+
+
+def _buffered_copy(source_file, destination_file, limiter=None):
+    buffer = bytearray(LIMITED_CHUNK_SIZE if limiter else BUFFER_SIZE)
+    view = memoryview(buffer)
+    remaining = os.fstat(source_file.fileno()).st_size - source_file.tell()
+    while True:
+        # Wait for the bandwidth before reading, not after
+        if limiter and remaining > 0:
+            limiter.consume(min(len(buffer), remaining))
+        count = source_file.readinto(buffer)
+        remaining -= count or 0
+        if not count:
+            break
+        destination_file.write(view[:count])
+
+
+def copy_file(source, destination, limiter=None):
+    """
+    Copy a file byte for byte. The copy is written next to the destination and
+    renamed into place, so the destination is never seen half written.
+
+    Tries, in order: reflink (no data copied), copy_file_range (in-kernel), and a
+    plain copy with a large buffer.
+
+    Args:
+        source (str): File to copy
+        destination (str): Destination path (replaced if it exists)
+        limiter (RateLimiter): Optional bandwidth cap
+
+    Returns:
+        str: destination
+    """
+
+    directory = os.path.dirname(destination)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    temp_path = f"{destination}.{os.getpid()}.tmp"
+    size = os.path.getsize(source)
+
+    try:
+        with open(source, 'rb') as source_file, open(temp_path, 'wb') as destination_file:
+            if not _reflink(source_file, destination_file) and not _copy_file_range(source_file, destination_file, size, limiter):
+                _buffered_copy(source_file, destination_file, limiter)
+        shutil.copystat(source, temp_path)
+        os.replace(temp_path, destination)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return destination
+
+
+def link_or_copy(source, destination):
+    """
+    Hard link source at destination, or copy_file it if the filesystem can't link.
+    Atomic as copy_file.
+
+    Both paths share the same data: writing to either one in place (ej: an exporter
+    overwriting the destination) changes the other too. Only link files that are
+    never written again, use copy_file (reflink when possible) otherwise.
+
+    Returns:
+        str: destination
+    """
+
+    directory = os.path.dirname(destination)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    temp_path = f"{destination}.{os.getpid()}.tmp"
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        return copy_file(source, destination)
+
+    os.replace(temp_path, destination)
+    return destination
+
+
+class TransferEngine:
+    """
+    Moves files (ej: exports staged on local scratch) to their final paths in the
+    background: several files at once, each written next to its destination and
+    renamed into place, all under one bandwidth cap.
+
+    Usage:
+        with TransferEngine() as engine:
+            engine.submit(local_path, publish_path)
+        # every transfer is done (or raised) here
+    """
+
+    def __init__(self, workers=None, bandwidth_mbps=None, move=True):
+        """
+        Args:
+            workers (int): Files copied at the same time (TRANSFER_WORKERS)
+            bandwidth_mbps (float): Total MB/s cap, 0 for none (BANDWIDTH_LIMIT)
+            move (bool): Remove the source once it is in place
+        """
+        bandwidth_mbps = BANDWIDTH_LIMIT if bandwidth_mbps is None else bandwidth_mbps
+        self.limiter = RateLimiter(bandwidth_mbps * 1024 ** 2) if bandwidth_mbps else None
+        self.move = move
+        self._pool = ThreadPoolExecutor(max_workers=workers or TRANSFER_WORKERS, thread_name_prefix='wknd_transfer')
+        self._futures = []
+
+    def _transfer(self, source, destination):
+        start = time.perf_counter()
+        copy_file(source, destination, self.limiter)
+        if self.move:
+            os.remove(source)
+        seconds = time.perf_counter() - start
+        size = os.path.getsize(destination) / 1024 ** 2
+        print(f"✓ Transferred {destination} ({size:.1f} MB, {seconds:.1f}s)")
+        return destination
+
+    def submit(self, source, destination):
+        """Queue a transfer, returns its Future"""
+        future = self._pool.submit(self._transfer, source, destination)
+        self._futures.append(future)
+        return future
+
+    def wait(self):
+        """
+        Block until every submitted transfer is done
+
+        Returns:
+            list: Destination paths
+
+        Raises:
+            The first transfer error (the other transfers still finish)
+        """
+        futures, self._futures = self._futures, []
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error:
+                raise error
+        return [future.result() for future in futures]
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.wait()
+        finally:
+            self.close()
+        return False
+
+
+def transfer_files(pairs, workers=None, bandwidth_mbps=None, move=False):
+    """
+    Copy (source, destination) pairs in parallel with a TransferEngine
+
+    Returns:
+        list: Destination paths
+    """
+    with TransferEngine(workers, bandwidth_mbps, move) as engine:
+        for source, destination in pairs:
+            engine.submit(source, destination)
+        return engine.wait()
+
@@ -0,0 +1,329 @@
+"""Background upload queue for review media, journaled on local disk so it survives a Maya crash"""
+import sgtk
+import os
+import json
+import time
+import uuid
+import socket
+import threading
+
+
+# Journal folder on local disk, one json per job. Can be moved with WKND_UPLOAD_JOURNAL
+JOURNAL_DIR = os.environ.get('WKND_UPLOAD_JOURNAL', os.path.join(os.path.expanduser('~'), '.wknd_tools', 'upload_journal'))
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 5  # seconds, doubles on every retry
+BACKOFF_MAX = 600
+
+
+class UploadQueue:
+    """
+    Uploads files to ShotGrid in a background thread.
+
+    Every job is written to its own json in the journal folder before it is queued
+    and removed once it is done. A job belongs to the Maya session that queued it
+    (host and pid): when the queue starts it resumes the jobs whose session is gone
+    (after a crash or a closed Maya), claimed with an atomic rename so two sessions
+    never take the same job, and leaves alone the jobs of sessions still running.
+    Failed uploads are retried with exponential backoff and listeners are called
+    with (job, success, error) when a job ends.
+    """
+
+    def __init__(self, journal_dir=JOURNAL_DIR, sg_factory=None):
+
+        self.journal_dir = journal_dir
+        self.owner = {'host': socket.gethostname(), 'pid': os.getpid()}
+        # Worker gets its own connection, shotgun_api3 connections are not thread safe
+        self._sg_factory = sg_factory or (lambda: sgtk.platform.current_engine().shotgun)
+        self._jobs = {}
+        self._listeners = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._thread = None
+
+        self._load()
+
+    # PUBLIC ##############################
+
+    def add_listener(self, callback, key=None):
+        """
+        callback(job, success, error) is called from the worker thread when a job ends.
+        A listener added again with the same key replaces the previous one
+        """
+        self._listeners[key or callback] = callback
+
+    def enqueue(self, entity_type, entity_id, path, field='sg_uploaded_movie', update_data=None, thumbnail=False):
+        """
+        Queue a file upload
+
+        Args:
+            entity_type (str): ej: 'Version'
+            entity_id (int): Entity id
+            path (str): Local file to upload
+            field (str): Upload field (ignored for thumbnails)
+            update_data (dict): Fields to update on the entity once uploaded
+            thumbnail (bool): Upload as entity thumbnail instead of a file field
+
+        Returns:
+            str: Job id
+        """
+        job = {
+            'id': uuid.uuid4().hex,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'path': path,
+            'field': field,
+            'update_data': update_data or {},
+            'thumbnail': thumbnail,
+            'status': 'pending',
+            'attempts': 0,
+            'next_try': 0,
+            'error': None,
+            'created': time.time(),
+            'owner': self.owner,
+        }
+
+        with self._lock:
+            self._jobs[job['id']] = job
+            self._save(job)
+
+        self.start()
+        self._wake.set()
+
+        return job['id']
+
+    def pending(self):
+        """Jobs not finished yet (pending or uploading)"""
+        with self._lock:
+            return [dict(job) for job in self._jobs.values() if job['status'] != 'failed']
+
+    def failed(self):
+        """Jobs that ran out of attempts, kept in the journal until retried"""
+        with self._lock:
+            return [dict(job) for job in self._jobs.values() if job['status'] == 'failed']
+
+    def retry_failed(self):
+        """Put failed jobs back in the queue"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job['status'] == 'failed':
+                    job.update(status='pending', attempts=0, next_try=0, error=None)
+                    self._save(job)
+        self.start()
+        self._wake.set()
+
+    def start(self):
+        """Start the worker thread (no-op if it is running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='wknd_upload_queue', daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """Block until the queue has nothing left to do (for batch tools). Returns False on timeout"""
+        self._wake.set()
+        deadline = None if timeout is None else time.time() + timeout
+        while self.pending():
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            self._idle.wait(remaining if remaining is not None else 1.0)
+            self._idle.clear()
+        return True
+
+    # PRIVATE ##############################
+
+    def _load(self):
+        """Claim the jobs of finished sessions"""
+        if not os.path.isdir(self.journal_dir):
+            return
+
+        for entry in os.scandir(self.journal_dir):
+            if entry.name.endswith('.claim'):
+                self._release_claim(entry.path)
+
+        for entry in os.scandir(self.journal_dir):
+            if entry.name.endswith('.json'):
+                job = self._claim(entry.path)
+                if job:
+                    self._jobs[job['id']] = job
+
+        if self.pending():
+            print(f"✓ Resuming {len(self.pending())} pending uploads")
+            self.start()
+
+    def _claim(self, job_path):
+        """Take over a job whose session is gone. None if it is unreadable or someone else owns it"""
+        try:
+            with open(job_path, 'r') as f:
+                job = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Upload journal entry unreadable, skipped: {job_path} - {e}")
+            return None
+
+        if _owner_alive(job.get('owner')):
+            return None
+
+        # Only one session wins the rename, the others get FileNotFoundError
+        claim_path = f"{job_path}.{os.getpid()}.claim"
+        try:
+            os.rename(job_path, claim_path)
+        except OSError:
+            return None
+
+        # Interrupted uploads start again
+        if job['status'] == 'uploading':
+            job['status'] = 'pending'
+        job['owner'] = self.owner
+
+        self._save(job)
+        os.remove(claim_path)
+        return job
+
+    def _release_claim(self, claim_path):
+        """Put back the job of a session that died while claiming it ("<id>.json.<pid>.claim")"""
+        job_path, pid = claim_path[:-len('.claim')].rsplit('.', 1)
+        if pid.isdigit() and not _owner_alive({'host': self.owner['host'], 'pid': int(pid)}):
+            try:
+                os.rename(claim_path, job_path)
+            except OSError:
+                pass
+
+    def _job_path(self, job):
+        return os.path.join(self.journal_dir, f"{job['id']}.json")
+
+    def _save(self, job):
+        """Write the job json atomically (call with the lock held)"""
+        if not os.path.exists(self.journal_dir):
+            os.makedirs(self.journal_dir)
+
+        job_path = self._job_path(job)
+        temp_path = f"{job_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(job, f, indent=4)
+        os.replace(temp_path, job_path)
+
+    def _remove(self, job):
+        """Remove the job json (call with the lock held)"""
+        try:
+            os.remove(self._job_path(job))
+        except FileNotFoundError:
+            pass
+
+    def _next_job(self):
+        """Next due job and seconds to wait for the next one if none is due"""
+        now = time.time()
+        with self._lock:
+            waiting = [job for job in self._jobs.values() if job['status'] == 'pending']
+            due = [job for job in waiting if job['next_try'] <= now]
+            if due:
+                job = min(due, key=lambda j: j['created'])
+                job['status'] = 'uploading'
+                self._save(job)
+                return job, None
+            if waiting:
+                return None, min(job['next_try'] for job in waiting) - now
+            return None, None
+
+    def _run(self):
+        while True:
+            job, wait_time = self._next_job()
+            if job:
+                self._process(job)
+                continue
+
+            self._idle.set()
+            self._wake.wait(wait_time)
+            self._wake.clear()
+
+    def _process(self, job):
+        error = None
+
+        try:
+            if not os.path.exists(job['path']):
+                raise IOError(f"File not found: {job['path']}")
+
+            sg = self._sg_factory()
+            if job['thumbnail']:
+                sg.upload_thumbnail(job['entity_type'], job['entity_id'], job['path'])
+            else:
+                sg.upload(job['entity_type'], job['entity_id'], job['path'], job['field'])
+            if job['update_data']:
+                sg.update(job['entity_type'], job['entity_id'], job['update_data'])
+
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            job['attempts'] += 1
+            if error is None:
+                del self._jobs[job['id']]
+                self._remove(job)
+            elif job['attempts'] >= MAX_ATTEMPTS or not os.path.exists(job['path']):
+                job.update(status='failed', error=error)
+            else:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (job['attempts'] - 1))
+                job.update(status='pending', error=error, next_try=time.time() + delay)
+                print(f"⚠ Upload failed ({job['attempts']}/{MAX_ATTEMPTS}), retrying in {delay}s: {job['path']} - {error}")
+            if error is not None:
+                self._save(job)
+            finished = error is None or job['status'] == 'failed'
+
+        if finished:
+            for callback in list(self._listeners.values()):
+                try:
+                    callback(dict(job), error is None, error)
+                except Exception as e:
+                    print(f"⚠ Upload listener error: {e}")
+
+
+def _owner_alive(owner):
+    """
+    True if the session that owns a job may still be running: same host and its
+    process exists, or another host (its processes can't be checked from here)
+    """
+    if not owner:
+        return False
+    if owner['host'] != socket.gethostname():
+        return True
+
+    pid = owner['pid']
+    if pid == os.getpid():
+        return True
+
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows, ask for its exit code instead
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# Keep the running queue when the module is reloaded (importlib.reload in the tools),
+# a second queue would start another worker on the same journal
+try:
+    _upload_queue
+except NameError:
+    _upload_queue = None
+
+
+def get_upload_queue():
+    """Shared queue for the session, resumes whatever the journal still has pending"""
+    global _upload_queue
+    if _upload_queue is None:
+        _upload_queue = UploadQueue()
+    return _upload_queue
@@ -1,5 +1,6 @@
 """Version creation and management"""
 import sgtk
+from . import upload_queue
 
 
 def create_version(context, version_name, description="", sg=None):
@@ -57,4 +58,24 @@ def upload_thumbnail(version_id, thumbnail_path):
 
     engine = sgtk.platform.current_engine()
     sg = engine.shotgun
-    sg.upload_thumbnail('Version', version_id, thumbnail_path)
\ No newline at end of file
+    sg.upload_thumbnail('Version', version_id, thumbnail_path)
+
+
+def queue_video_upload(version_id, video_path):
+    """
+    Upload video to Version in the background (see upload_queue).
+
+    Returns:
+        str: Upload job id
+    """
+    return upload_queue.get_upload_queue().enqueue(
+        'Version',
+        version_id,
+        video_path,
+        field='sg_uploaded_movie',
+        update_data={'sg_path_to_movie': video_path})
+
+
+def queue_thumbnail_upload(version_id, thumbnail_path):
+    """Upload thumbnail to Version in the background. Returns the upload job id"""
+    return upload_queue.get_upload_queue().enqueue('Version', version_id, thumbnail_path, thumbnail=True)
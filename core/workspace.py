@@ -0,0 +1,111 @@
+"""Per-publish scratch workspaces, so parallel publishes never share temp files"""
+import os
+import shutil
+import tempfile
+import threading
+
+
+# Scratch root (ej: a local NVMe), can be set with WKND_SCRATCH_ROOT
+SCRATCH_ROOT = os.environ.get('WKND_SCRATCH_ROOT', os.path.realpath(tempfile.gettempdir()))
+
+# Free space below which a warning is logged when no estimate is given,
+# can be set with WKND_SCRATCH_MIN_FREE_GB
+MIN_FREE_BYTES = int(float(os.environ.get('WKND_SCRATCH_MIN_FREE_GB', 5)) * 1024 ** 3)
+
+# Rough size of a captured viewport frame per pixel, by intermediate image format
+CAPTURE_BYTES_PER_PIXEL = {
+    'png': 1.5,
+    'jpg': 0.3,
+    'tif': 3,
+}
+
+_active = threading.local()
+
+
+class Workspace:
+    """
+    Unique scratch folder for one publish (or one batch job).
+
+    Every media and export step asks for its temp paths here (see scratch_dir and
+    scratch_file), so two Maya sessions or a batch publisher never overwrite each
+    other's files. The folder is removed when the workspace ends.
+
+    Usage:
+        with Workspace('publish') as ws:
+            capture_dir = ws.subdir('capture')
+    """
+
+    def __init__(self, name='publish', root=None, min_free_bytes=None, keep=False):
+
+        self.root = root or SCRATCH_ROOT
+        self.keep = keep
+        self.path = None
+        self._previous = None
+
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+        # Preflight: fail before any work if the planned outputs (min_free_bytes, see
+        # estimate_capture_bytes) do not fit, only warn on the generic threshold
+        free = shutil.disk_usage(self.root).free
+        if min_free_bytes is not None and free < min_free_bytes:
+            raise IOError(f"Not enough free space on {self.root}: {free / 1024 ** 3:.1f} GB free, "
+                          f"{min_free_bytes / 1024 ** 3:.1f} GB needed")
+        if min_free_bytes is None and free < MIN_FREE_BYTES:
+            print(f"⚠ Low free space on {self.root}: {free / 1024 ** 3:.1f} GB free")
+
+        self.path = tempfile.mkdtemp(prefix=f"wknd_{name}_", dir=self.root)
+
+    def subdir(self, name):
+        """Folder inside the workspace (created if needed)"""
+        path = os.path.join(self.path, name)
+        if not os.path.exists(path):
+            os.makedirs(path)
+        return path
+
+    def file(self, name):
+        """Path of a file inside the workspace"""
+        return os.path.join(self.path, name)
+
+    def activate(self):
+        """Make this the workspace returned by current() on this thread"""
+        self._previous = getattr(_active, 'workspace', None)
+        _active.workspace = self
+        return self
+
+    def cleanup(self):
+        """Deactivate and remove the workspace folder (unless keep=True)"""
+        if getattr(_active, 'workspace', None) is self:
+            _active.workspace = self._previous
+        if self.path and not self.keep:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self.activate()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cleanup()
+        return False
+
+
+def estimate_capture_bytes(frame_count, width, height, image_format='png'):
+    """Scratch space taken by a viewport capture of frame_count frames (rough)"""
+    return int(frame_count * width * height * CAPTURE_BYTES_PER_PIXEL.get(image_format, 3))
+
+
+def current():
+    """Active workspace on this thread, or None"""
+    return getattr(_active, 'workspace', None)
+
+
+def scratch_dir(name):
+    """
+    Unique temp folder for a step: inside the active workspace if there is one,
+    else a new folder under SCRATCH_ROOT (the caller removes it)
+    """
+    workspace = current()
+    if workspace:
+        return tempfile.mkdtemp(prefix=f"{name}_", dir=workspace.path)
+    if not os.path.exists(SCRATCH_ROOT):
+        os.makedirs(SCRATCH_ROOT)
+    return tempfile.mkdtemp(prefix=f"wknd_{name}_", dir=SCRATCH_ROOT)
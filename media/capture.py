@@ -1,14 +1,41 @@
 """Maya viewport capture utilities"""
 import maya.cmds as mc
-import tempfile
+import maya.api.OpenMaya as om2
+import maya.api.OpenMayaUI as omui2
+import ctypes
 import os
-import glob
-
-
-def capture_viewport_sequence(start_frame=None, end_frame=None, sequence_capture=False, width=1920, height=1080):
+import shutil
+from . import frame_sequence
+from ..core import workspace
+
+
+# Fast capture for animation dailies: half resolution, no textures, flat shading,
+# every 2nd frame (held) and jpg intermediates
+DRAFT_OPTIONS = {
+    'percent': 50,
+    'quality': 80,
+    'textures': False,
+    'display_appearance': 'flatShaded',
+    'frame_step': 2,
+    'image_format': 'jpg',
+}
+
+
+def capture_viewport_sequence(start_frame=None, end_frame=None, sequence_capture=False, width=1920, height=1080,
+                              percent=100, quality=100, textures=True, display_appearance='smoothShaded',
+                              frame_step=1, image_format='png', sequence_time=False):
     """
     Capture viewport as image sequence
 
+    Args:
+        percent (int): Playblast scale percent of width/height
+        quality (int): Compression quality
+        textures (bool): Show textures in the viewport
+        display_appearance (str): 'smoothShaded', 'flatShaded', 'wireframe', 'boundingBox'...
+        frame_step (int): Capture every Nth frame, skipped frames hold the previous one
+        image_format (str): Intermediate image format ('png', 'jpg', 'tif'...)
+        sequence_time (bool): Capture the image sequence through the camera sequencer
+
     Returns:
         dict: {'pattern': str, 'files': list, 'format': str}
     """
@@ -22,19 +49,16 @@ def capture_viewport_sequence(start_frame=None, end_frame=None, sequence_capture
 
     # Configure viewport
     panel = _get_active_panel()
-    _setup_clean_viewport(panel)
+    _setup_clean_viewport(panel, textures=textures, display_appearance=display_appearance)
 
-    # Playblast to temp
-    temp_dir = os.path.realpath(tempfile.gettempdir())
-    output_base = os.path.join(temp_dir, "wknd_capture")
-    # Create folder if not exists
-    if not os.path.exists(output_base):
-        os.makedirs(output_base)
+    # Playblast to a unique folder of the publish workspace
+    capture_dir = workspace.scratch_dir('capture')
+    output_base = os.path.join(capture_dir, "wknd_capture")
 
     if sequence_capture:
 
         filename = "temp.mov"
-        output_base_file = os.path.join(output_base, filename)
+        output_base_file = os.path.join(capture_dir, filename)
         width = 1280
         height = 720
 
@@ -62,31 +86,42 @@ def capture_viewport_sequence(start_frame=None, end_frame=None, sequence_capture
         # Find generated files
         return {
             'files': output_base_file,
-            'format': 'qt'
+            'format': 'qt',
+            'dir': capture_dir
         }
 
     else:
 
+        frame_args = {'startTime': start_frame, 'endTime': end_frame}
+        if frame_step > 1:
+            frame_args = {'frame': list(range(int(start_frame), int(end_frame) + 1, int(frame_step)))}
+
         mc.playblast(
             filename=output_base,
             format='image',
-            sequenceTime=False,
+            sequenceTime=sequence_time,
             clearCache=True,
             viewer=False,
             showOrnaments=False,
             framePadding=4,
-            percent=100,
-            compression='png',
-            quality=100,
+            percent=percent,
+            compression=image_format,
+            quality=quality,
             widthHeight=[width, height],
-            startTime=start_frame,
-            endTime=end_frame,
-            forceOverwrite=True
+            forceOverwrite=True,
+            **frame_args
         )
 
         # Find generated files
-        files = sorted(glob.glob(os.path.join(temp_dir, "wknd_capture.*.png")))
-        pattern = os.path.join(temp_dir, "wknd_capture.%04d.png")
+        pattern = os.path.join(capture_dir, f"wknd_capture.%04d.{image_format}")
+        sequence = frame_sequence.find_sequence(pattern)
+
+        # Skipped frames hold the previous captured one, so the encoder sees every frame
+        if sequence and frame_step > 1:
+            _fill_held_frames(sequence, int(end_frame))
+            sequence = frame_sequence.find_sequence(pattern)
+
+        files = sequence.paths() if sequence else []
 
         # Restore
         mc.currentTime(original_time)
@@ -94,11 +129,64 @@ def capture_viewport_sequence(start_frame=None, end_frame=None, sequence_capture
         return {
             'pattern': pattern,
             'files': files,
-            'format': 'png',
-            'count': len(files)
+            'format': image_format,
+            'count': len(files),
+            'dir': capture_dir
         }
 
 
+def iter_viewport_frames(start_frame=None, end_frame=None, width=1920, height=1080, textures=True, display_appearance='smoothShaded'):
+    """
+    Capture viewport frame by frame as raw RGBA buffers, without writing images to disk.
+    Frames are yielded as soon as they are read back, so an encoder can consume them
+    while the next one is being drawn.
+
+    The viewport is read back at its own size and resized to fit width x height
+    (aspect kept), so the frames match a capture_viewport_sequence of the same resolution.
+
+    Yields:
+        tuple: (frame, width, height, bytes) - bottom-up RGBA rows as read from OpenGL
+    """
+    if start_frame is None:
+        start_frame = mc.playbackOptions(query=True, minTime=True)
+    if end_frame is None:
+        end_frame = mc.playbackOptions(query=True, maxTime=True)
+
+    # Save current state
+    original_time = mc.currentTime(query=True)
+
+    # Configure viewport
+    panel = _get_active_panel()
+    _setup_clean_viewport(panel, textures=textures, display_appearance=display_appearance)
+    view = omui2.M3dView.getM3dViewFromModelPanel(panel)
+
+    image = om2.MImage()
+    size = None
+
+    try:
+        for frame in range(int(start_frame), int(end_frame) + 1):
+            mc.currentTime(frame, update=True)
+            view.refresh(False, True)
+            view.readColorBuffer(image, True)
+
+            # Viewport size is fixed during the capture, the target size is computed once
+            if size is None:
+                size = _fit_size(*image.getSize(), width, height)
+            if tuple(image.getSize()) != size:
+                image.resize(*size, False)
+
+            yield frame, size[0], size[1], ctypes.string_at(image.pixels(), size[0] * size[1] * 4)
+    finally:
+        # Restore
+        mc.currentTime(original_time)
+
+
+def _fit_size(width, height, max_width, max_height):
+    """Biggest even (width, height) with the aspect of width x height that fits max_width x max_height"""
+    scale = min(max_width / width, max_height / height)
+    return max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2)
+
+
 def _get_active_panel():
     """Get active model panel"""
     panel = mc.getPanel(withFocus=True)
@@ -107,12 +195,30 @@ def _get_active_panel():
     return panel
 
 
-def _setup_clean_viewport(panel):
+def _fill_held_frames(sequence, end_frame):
+    """Hard link (or copy) the last captured frame into every missing frame up to end_frame"""
+
+    held = sequence.frame_path(sequence.start)
+    captured = set(sequence.frames)
+    for frame in range(sequence.start, end_frame + 1):
+        path = sequence.frame_path(frame)
+        if frame in captured:
+            held = path
+            continue
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+            os.link(held, path)
+        except OSError:
+            shutil.copyfile(held, path)
+
+
+def _setup_clean_viewport(panel, textures=True, display_appearance='smoothShaded'):
     """Configure viewport for clean playblast"""
     mc.modelEditor(panel, edit=True,
                      grid=False,
-                     displayAppearance='smoothShaded',
-                     displayTextures=True,
+                     displayAppearance=display_appearance,
+                     displayTextures=textures,
                      wireframeOnShaded=False,
                      allObjects=False,
                      polymeshes=True,
@@ -123,8 +229,14 @@ def _setup_clean_viewport(panel):
 def cleanup_capture_files(capture_info):
     """Delete temporary capture files"""
     if 'files' in capture_info:
-        for f in capture_info['files']:
+        files = capture_info['files']
+        # Sequence captures return a single movie path
+        if isinstance(files, str):
+            files = [files]
+        for f in files:
             try:
                 os.remove(f)
             except:
-                pass
\ No newline at end of file
+                pass
+    if capture_info.get('dir'):
+        shutil.rmtree(capture_info['dir'], ignore_errors=True)
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""8-bit proxy frames for render folders, converted in parallel and cached on local disk"""
+import subprocess
+import os
+import tempfile
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Cache folder and size limit, can be moved to a fast local drive with WKND_PROXY_CACHE / WKND_PROXY_CACHE_GB
+PROXY_CACHE_DIR = os.environ.get('WKND_PROXY_CACHE', os.path.join(os.path.realpath(tempfile.gettempdir()), 'wknd_proxy_cache'))
+PROXY_CACHE_MAX_BYTES = int(float(os.environ.get('WKND_PROXY_CACHE_GB', 20)) * 1024 ** 3)
+PROXY_EXTENSION = '.jpg'
+PROXY_MAX_WIDTH = 1920
+MAX_PARALLEL_CONVERSIONS = max(1, min(16, os.cpu_count() or 2))
+
+
+def build_proxies(image_paths, cache_dir=None):
+    """
+    Convert frames (EXR, PNG...) to 8-bit proxies in parallel ffmpeg processes.
+
+    Proxies are cached by (path, mtime, size), so republishing the same render
+    only converts frames that changed. Least recently used proxies are evicted
+    once the cache is over PROXY_CACHE_MAX_BYTES.
+
+    Args:
+        image_paths (list): Source frames, in order
+        cache_dir (str): Cache folder, PROXY_CACHE_DIR by default
+
+    Returns:
+        list: Proxy paths in the same order, or None if any conversion failed
+    """
+    cache_dir = cache_dir or PROXY_CACHE_DIR
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+
+    proxy_paths = [_proxy_path(image_path, cache_dir) for image_path in image_paths]
+    pending = []
+    for src, dst in zip(image_paths, proxy_paths):
+        try:
+            # mtime of a proxy is its last use, see evict
+            os.utime(dst)
+        except FileNotFoundError:
+            pending.append((src, dst))
+
+    print(f"✓ Proxies: {len(image_paths) - len(pending)} cached, {len(pending)} to convert")
+
+    if pending:
+        # ffmpeg does the work in its own process, threads here only wait on them
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_CONVERSIONS) as pool:
+            results = list(pool.map(lambda job: _convert(*job), pending))
+
+        if not all(results):
+            return None
+
+    evict(cache_dir=cache_dir, keep=proxy_paths)
+
+    return proxy_paths
+
+
+def evict(max_bytes=None, cache_dir=None, keep=()):
+    """
+    Delete least recently used proxies until the cache fits in max_bytes
+
+    Args:
+        max_bytes (int): Size limit, PROXY_CACHE_MAX_BYTES by default
+        cache_dir (str): Cache folder, PROXY_CACHE_DIR by default
+        keep (list): Proxies never evicted (ej: the ones about to be encoded)
+    """
+    max_bytes = PROXY_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    cache_dir = cache_dir or PROXY_CACHE_DIR
+    if not os.path.exists(cache_dir):
+        return
+
+    keep = set(keep)
+    entries = []
+    total = 0
+    for entry in os.scandir(cache_dir):
+        # Skip files of conversions still running (see _convert)
+        if not entry.is_file() or '.tmp' in entry.name:
+            continue
+        stat = entry.stat()
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+
+    if total <= max_bytes:
+        return
+
+    evicted = 0
+    oldest = None
+    for last_used, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        evicted += 1
+        oldest = oldest or last_used
+
+    if evicted:
+        print(f"✓ Proxy cache evicted: {evicted} proxies (unused since {time.ctime(oldest)})")
+
+
+def clear_cache(cache_dir=None):
+    """Delete every cached proxy"""
+    cache_dir = cache_dir or PROXY_CACHE_DIR
+    if not os.path.exists(cache_dir):
+        return
+
+    for entry in os.scandir(cache_dir):
+        if entry.is_file():
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+# PRIVATE ##############################
+
+def _proxy_path(image_path, cache_dir):
+    """Cache path for a frame, keyed by its absolute path, mtime and size"""
+    image_path = os.path.abspath(image_path)
+    stat = os.stat(image_path)
+    key = hashlib.sha1(f"{image_path}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()
+    return os.path.join(cache_dir, key + PROXY_EXTENSION)
+
+
+def _convert(image_path, proxy_path):
+    """Convert one frame, written to a temp name and renamed so a half proxy is never cached"""
+    temp_path = f"{os.path.splitext(proxy_path)[0]}.{os.getpid()}.tmp{PROXY_EXTENSION}"
+
+    cmd = [
+        'ffmpeg',
+        '-y',
+        '-loglevel', 'error',
+        '-i', image_path,
+        '-vf', f"scale='min({PROXY_MAX_WIDTH},iw)':-2",
+        '-q:v', '2',
+        '-frames:v', '1',
+        temp_path
+    ]
+
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        os.replace(temp_path, proxy_path)
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"FFmpeg error ({image_path}): {e.stderr.decode()}")
+        return False
+    except OSError as e:
+        print(f"❌ Cannot store proxy for {image_path}: {e}")
+        return False
@@ -0,0 +1,135 @@
+"""Frame sequence detection for media folders (one os.scandir pass, no glob/regex per consumer)"""
+import os
+import re
+
+
+# name.1001.exr / name_1001.exr / name1001.exr -> prefix, frame digits, extension
+_FRAME_RE = re.compile(r'^(?P<prefix>.*?)(?P<frame>\d+)(?P<ext>\.[^.]+)$')
+
+IMAGE_EXTENSIONS = ('.exr', '.png', '.jpg', '.jpeg', '.tif', '.tiff', '.dpx')
+
+
+class FrameSequence:
+    """
+    Numbered image sequence inside one folder
+
+    Attributes:
+        directory (str): Folder
+        prefix (str): Everything before the frame number ("beauty.")
+        padding (int): Frame digits (0 if frames are not zero padded)
+        extension (str): ".exr"
+        frames (list): Sorted frame numbers
+    """
+
+    def __init__(self, directory, prefix, padding, extension, frames):
+        self.directory = directory
+        self.prefix = prefix
+        self.padding = padding
+        self.extension = extension
+        self.frames = sorted(frames)
+
+    def __repr__(self):
+        return f"<FrameSequence {self.pattern} {self.start}-{self.end} ({len(self.frames)} frames)>"
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def start(self):
+        return self.frames[0]
+
+    @property
+    def end(self):
+        return self.frames[-1]
+
+    @property
+    def gaps(self):
+        """Missing frame numbers between start and end"""
+        present = set(self.frames)
+        return [frame for frame in range(self.start, self.end + 1) if frame not in present]
+
+    @property
+    def pattern(self):
+        """ffmpeg style pattern ("/path/beauty.%04d.exr")"""
+        number = f"%0{self.padding}d" if self.padding else "%d"
+        return os.path.join(self.directory, f"{self.prefix}{number}{self.extension}")
+
+    def frame_path(self, frame):
+        return os.path.join(self.directory, f"{self.prefix}{frame:0{self.padding}d}{self.extension}")
+
+    def paths(self):
+        """Frame paths in frame order"""
+        return [self.frame_path(frame) for frame in self.frames]
+
+
+def scan_sequences(directory, extensions=IMAGE_EXTENSIONS):
+    """
+    Scan a folder once and group its files into frame sequences
+
+    Args:
+        directory (str): Folder to scan
+        extensions (tuple): Lower case extensions to keep, None for all
+
+    Returns:
+        list: FrameSequence objects, biggest first
+    """
+    groups = {}
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            match = _FRAME_RE.match(entry.name)
+            if not match:
+                continue
+
+            extension = match.group('ext')
+            if extensions and extension.lower() not in extensions:
+                continue
+
+            groups.setdefault((match.group('prefix'), extension), []).append(match.group('frame'))
+
+    sequences = []
+    for (prefix, extension), numbers in groups.items():
+
+        # Zero padded numbers give the padding, the rest join the widest padding they fit
+        # (1001 belongs to a %04d sequence, 12 does not)
+        by_padding = {}
+        loose = []
+        for digits in numbers:
+            if len(digits) > 1 and digits.startswith('0'):
+                by_padding.setdefault(len(digits), []).append(int(digits))
+            else:
+                loose.append(digits)
+
+        for digits in loose:
+            fits = [padding for padding in by_padding if padding and len(digits) >= padding]
+            by_padding.setdefault(max(fits) if fits else 0, []).append(int(digits))
+
+        for padding, frames in by_padding.items():
+            if padding == 0:
+                # Unpadded numbers of a single width (1001..9999) are still a fixed width sequence
+                widths = {len(str(frame)) for frame in frames}
+                padding = widths.pop() if len(widths) == 1 else 0
+            sequences.append(FrameSequence(directory, prefix, padding, extension, frames))
+
+    sequences.sort(key=lambda seq: (-len(seq), seq.prefix))
+
+    return sequences
+
+
+def find_sequence(pattern):
+    """
+    Find the sequence on disk for an ffmpeg style pattern ("/path/name.%04d.png")
+
+    Returns:
+        FrameSequence or None
+    """
+    directory, filename = os.path.split(pattern)
+    match = re.match(r'^(?P<prefix>.*?)%0?(?P<padding>\d*)d(?P<ext>\.[^.]+)$', filename)
+    if not match or not os.path.isdir(directory):
+        return None
+
+    for sequence in scan_sequences(directory, extensions=None):
+        if sequence.prefix == match.group('prefix') and sequence.extension == match.group('ext'):
+            return sequence
+
+    return None
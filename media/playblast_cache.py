@@ -0,0 +1,157 @@
+"""Local cache of encoded playblasts, keyed by a fingerprint of what the capture depends on"""
+import maya.cmds as mc
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from ..core import fingerprint
+import importlib
+importlib.reload(fingerprint)
+
+
+# Cache folder and size limit, can be set with WKND_PLAYBLAST_CACHE / WKND_PLAYBLAST_CACHE_GB
+CACHE_DIR = os.environ.get('WKND_PLAYBLAST_CACHE', os.path.join(os.path.realpath(tempfile.gettempdir()), 'wknd_playblast_cache'))
+CACHE_MAX_BYTES = int(float(os.environ.get('WKND_PLAYBLAST_CACHE_GB', 20)) * 1024 ** 3)
+
+_INDEX_FILE = 'index.json'
+
+
+def scene_key(start_frame, end_frame, width, height, profile, camera=None, extra=None):
+    """
+    Fingerprint of a capture: scene file (path, size and mtime), references (file,
+    loaded, size and mtime), animCurve data, camera (name and world matrix), frame
+    range, resolution and encoding profile.
+
+    Only a saved, unmodified scene has a key: its file stands for the geometry and
+    shading, which are too slow to hash on every playblast.
+
+    Returns:
+        str: Hex key, None if the scene has unsaved changes (not cacheable)
+    """
+    scene = mc.file(q=True, sceneName=True)
+    if not scene or not os.path.isfile(scene) or mc.file(q=True, modified=True):
+        return None
+
+    start = time.perf_counter()
+    hasher = hashlib.sha1()
+
+    if camera is None:
+        panel = mc.getPanel(withFocus=True)
+        if 'modelPanel' not in panel:
+            panel = mc.getPanel(type='modelPanel')[0]
+        camera = mc.modelPanel(panel, q=True, camera=True)
+
+    stat = os.stat(scene)
+    hasher.update(json.dumps({
+        'scene': [scene, stat.st_size, stat.st_mtime],
+        'references': _references(),
+        'camera': camera,
+        'camera_matrix': [round(value, 6) for value in mc.xform(camera, q=True, matrix=True, worldSpace=True)],
+        'range': [start_frame, end_frame],
+        'resolution': [width, height],
+        'profile': profile,
+        'extra': extra,
+    }, sort_keys=True).encode())
+
+    key = fingerprint.anim_curves_hash(hasher=hasher)
+    print(f"⏱ Playblast cache key: {time.perf_counter() - start:.2f}s")
+
+    return key
+
+
+def _references():
+    """[file, loaded, size, mtime] of every reference node"""
+    references = []
+    for node in sorted(mc.ls(type='reference') or []):
+        try:
+            path = mc.referenceQuery(node, filename=True, withoutCopyNumber=True)
+            loaded = mc.referenceQuery(node, isLoaded=True)
+        except RuntimeError:
+            continue  # sharedReferenceNode, references without file
+        stat = os.stat(path) if os.path.isfile(path) else None
+        references.append([node, path, loaded, stat and stat.st_size, stat and stat.st_mtime])
+    return references
+
+
+def get(key, outputs):
+    """
+    Copy a cached entry to the wanted output paths
+
+    Args:
+        key (str): scene_key
+        outputs (dict): {name: output_path} wanted (ej: movie, proxy, web, poster)
+
+    Returns:
+        dict: Manifest {name: output_path} if every output is cached, else None
+    """
+    entry_dir = os.path.join(CACHE_DIR, key)
+    index_path = os.path.join(entry_dir, _INDEX_FILE)
+    if not os.path.exists(index_path):
+        return None
+
+    with open(index_path, 'r') as f:
+        cached = json.load(f)
+
+    if not all(name in cached for name in outputs):
+        return None
+
+    for name, output_path in outputs.items():
+        if not os.path.exists(os.path.dirname(output_path)):
+            os.makedirs(os.path.dirname(output_path))
+        shutil.copyfile(os.path.join(entry_dir, cached[name]), output_path)
+
+    # LRU: last use is the index mtime
+    os.utime(index_path, None)
+
+    print(f"✓ Playblast cache hit: {key}")
+
+    return dict(outputs)
+
+
+def put(key, manifest):
+    """Store the files of a manifest {name: path} under key, then evict to the size limit"""
+    entry_dir = os.path.join(CACHE_DIR, key)
+    temp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+
+    index = {}
+    for name, path in manifest.items():
+        file_name = name + os.path.splitext(path)[1]
+        shutil.copyfile(path, os.path.join(temp_dir, file_name))
+        index[name] = file_name
+
+    with open(os.path.join(temp_dir, _INDEX_FILE), 'w') as f:
+        json.dump(index, f, indent=4)
+
+    # Whole entry appears at once, a reader never sees half of it
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(temp_dir, entry_dir)
+
+    evict()
+
+
+def evict(max_bytes=None):
+    """Delete least recently used entries until the cache fits in max_bytes"""
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.exists(CACHE_DIR):
+        return
+
+    entries = []
+    total = 0
+    for entry in os.scandir(CACHE_DIR):
+        index_path = os.path.join(entry.path, _INDEX_FILE)
+        if not entry.is_dir() or not os.path.exists(index_path):
+            continue
+        size = sum(f.stat().st_size for f in os.scandir(entry.path) if f.is_file())
+        entries.append((os.path.getmtime(index_path), size, entry.path))
+        total += size
+
+    for last_used, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        print(f"✓ Playblast cache evicted: {os.path.basename(path)} (unused since {time.ctime(last_used)})")
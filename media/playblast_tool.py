@@ -1,19 +1,43 @@
 """Playblast to video"""
 from . import capture
 from . import video_encoder
+from . import frame_proxies
+from . import frame_sequence
+from . import playblast_cache
+from ..core import workspace
 import importlib
 importlib.reload(capture)
 importlib.reload(video_encoder)
+importlib.reload(playblast_cache)
 import maya.cmds as mc
-import tempfile
+import maya.mel as mm
 import os
 import shutil
 
 
-def create_playblast(output_video):
+# Encoding profile per task step (see video_encoder.ENCODING_PROFILES)
+STEP_PROFILES = {
+    'Layout': 'review',
+    'Animation': 'review',
+    'Lighting': 'final',
+    'Comp': 'final',
+}
+
+
+def get_step_profile(step_name):
+    """Return the encoding profile for a task step, DEFAULT_PROFILE if not mapped"""
+    return STEP_PROFILES.get(step_name, video_encoder.DEFAULT_PROFILE)
+
+
+def create_playblast(output_video, streaming=False, profile=None):
     """
     Create playblast video from current camera
 
+    Args:
+        output_video (str): Output video path
+        streaming (bool): Pipe viewport frames straight to ffmpeg instead of PNGs on disk
+        profile (str): Encoding profile name (video_encoder.ENCODING_PROFILES)
+
     Returns:
         str: Path to video or None
     """
@@ -21,6 +45,12 @@ def create_playblast(output_video):
     if not os.path.exists(os.path.dirname(output_video)):
         os.makedirs(os.path.dirname(output_video))
 
+    profile = profile or video_encoder.DEFAULT_PROFILE
+
+    if streaming:
+        manifest = _stream_viewport({'movie': (output_video, profile)})
+        return manifest.get('movie')
+
     # capture viewport
     capture_info = capture.capture_viewport_sequence()
 
@@ -30,7 +60,8 @@ def create_playblast(output_video):
     success = video_encoder.images_to_video(
         capture_info['pattern'] ,
         output_video,
-        'playblast')
+        'playblast',
+        profile=profile)
 
     # Cleanup
     capture.cleanup_capture_files(capture_info)
@@ -38,18 +69,126 @@ def create_playblast(output_video):
     return output_video if success else None
 
 
-def create_movie_from_folder(folder, output_path=None):
+def pick_poster_frame(files, pattern=None, method='middle'):
+    """
+    Choose a representative frame from a captured sequence
+
+    Args:
+        files (list): Captured frames in order
+        pattern (str): ffmpeg pattern of the frames (needed for 'scene_change')
+        method (str): 'middle' or 'scene_change' (frame right after the biggest change)
+
+    Returns:
+        int: Index in files
+    """
+    if not files:
+        return None
+
+    if method == 'scene_change' and pattern:
+        scores = video_encoder.scene_change_scores(pattern)
+        if len(scores) == len(files) and max(scores) > 0:
+            return scores.index(max(scores))
+
+    return len(files) // 2
+
+
+def create_review_media(output_video, profile=None, proxy=True, web=True, on_poster=None, poster_method='middle', use_cache=True, capture_options=None, streaming=False):
+    """
+    Capture the viewport once and build every review file from a single decode:
+    movie, poster frame (.jpg) and optionally a proxy and a web mp4 next to it.
+
+    Args:
+        on_poster (callable): Called with the poster frame path right after the
+            capture, before encoding, so the thumbnail can be uploaded first
+        poster_method (str): See pick_poster_frame
+        use_cache (bool): Reuse the files of a previous run when the scene fingerprint
+            (saved scene, references, animation, camera, range, resolution, profile)
+            matches (see playblast_cache.scene_key)
+        capture_options (dict): Extra capture_viewport_sequence args (ej: capture.DRAFT_OPTIONS)
+        streaming (bool): Pipe viewport frames straight to ffmpeg instead of images on disk.
+            The poster is then the middle frame and on_poster is called after the encode
+
+    Returns:
+        dict: Manifest {'movie', 'poster', 'proxy', 'web': path}, empty dict if failed
+    """
+    # Create folder if needed
+    if not os.path.exists(os.path.dirname(output_video)):
+        os.makedirs(os.path.dirname(output_video))
+
+    base_path = os.path.splitext(output_video)[0]
+    profile = profile or video_encoder.DEFAULT_PROFILE
+    outputs = {'movie': (output_video, profile)}
+    if proxy:
+        outputs['proxy'] = (f"{base_path}_proxy.mp4", 'draft')
+    if web:
+        outputs['web'] = (f"{base_path}_web.mp4", 'web')
+    poster_path = f"{base_path}.jpg"
+
+    if use_cache:
+        start_frame = mc.playbackOptions(query=True, minTime=True)
+        end_frame = mc.playbackOptions(query=True, maxTime=True)
+        cache_key = playblast_cache.scene_key(start_frame, end_frame, 1920, 1080, profile, extra=[poster_method, sorted(outputs), capture_options, streaming])
+
+        wanted = {name: path for name, (path, _) in outputs.items()}
+        wanted['poster'] = poster_path
+        manifest = playblast_cache.get(cache_key, wanted) if cache_key else None
+        if manifest:
+            if on_poster:
+                on_poster(manifest['poster'])
+            return manifest
+
+    if streaming:
+        # capture and encode at once, the poster exists only when the encode is done
+        manifest = _stream_viewport(outputs, poster_path, capture_options)
+        if manifest and on_poster:
+            on_poster(manifest['poster'])
+
+    else:
+        # capture viewport
+        capture_info = capture.capture_viewport_sequence(**(capture_options or {}))
+
+        if not capture_info['files']:
+            return {}
+
+        poster_index = pick_poster_frame(capture_info['files'], capture_info['pattern'], poster_method)
+        if on_poster:
+            on_poster(capture_info['files'][poster_index])
+
+        manifest = video_encoder.images_to_review_media(
+            capture_info['pattern'],
+            outputs,
+            poster_path=poster_path,
+            poster_frame=poster_index)
+
+        # Cleanup
+        capture.cleanup_capture_files(capture_info)
+
+    if use_cache and cache_key and manifest:
+        try:
+            playblast_cache.put(cache_key, manifest)
+        except OSError as e:
+            print(f"⚠ Cannot store playblast in cache: {e}")
+
+    return manifest
+
+
+def create_movie_from_folder(folder, output_path=None, profile=None, on_poster=None):
     """
     Create movie from images from folder for version thumbnail
 
+    Args:
+        folder (str): Images folder
+        output_path (str): Output video path, temp file if not given
+        profile (str): Encoding profile name, 'mjpeg' (RV like) if not given
+        on_poster (callable): Called with a jpg of the middle frame before encoding
+
     Returns:
         str: Path to video or None
 
     """
 
     if not output_path:
-        temp_dir = os.path.realpath(tempfile.gettempdir())
-        output_video = os.path.join(temp_dir, "wknd_playblast.mp4")
+        output_video = os.path.join(workspace.scratch_dir('movie'), "wknd_playblast.mp4")
 
     else:
         # Create folder if needed
@@ -57,10 +196,20 @@ def create_movie_from_folder(folder, output_path=None):
             os.makedirs(os.path.dirname(output_path))
         output_video = output_path
 
+    if on_poster:
+        # Middle frame proxy, the folder encode reuses it from the proxy cache
+        sequences = frame_sequence.scan_sequences(folder, ('.exr', '.png', '.jpg'))
+        if sequences:
+            paths = sequences[0].paths()
+            poster = frame_proxies.build_proxies([paths[len(paths) // 2]])
+            if poster:
+                on_poster(poster[0])
+
     success = video_encoder.images_to_video(
         folder,
         output_video,
-        'folder')
+        'folder',
+        profile=profile)
 
     return output_video if success else None
 
@@ -98,6 +247,166 @@ def create_sequence_playblast(output_video):
 
     return output_video if success else None
 
+def get_sequencer_shots():
+    """
+    Shot boundaries from the camera sequencer, in sequence order
+
+    Returns:
+        list: [{'name', 'camera', 'seq_start', 'seq_end'}]
+    """
+    seq_manager = mc.sequenceManager(q=True, node=True)
+    sequencer = mc.listConnections(seq_manager, type='sequencer')[0]
+    shots = mc.listConnections(sequencer, type="shot") or []  # Get a list of all shots from the sequencer.
+
+    shots_info = []
+    for shot in shots:
+        camera = mc.listConnections(shot + '.currentCamera') or [None]
+        shots_info.append({
+            'name': mc.getAttr(shot + '.shotName'),
+            'camera': camera[0],
+            'seq_start': mc.getAttr(shot + '.sequenceStartFrame'),
+            'seq_end': mc.getAttr(shot + '.sequenceEndFrame'),
+        })
+
+    return sorted(shots_info, key=lambda shot: shot['seq_start'])
+
+
+def _sequence_audio(start, fps):
+    """
+    Sound of the sequence for the review movie
+
+    Returns:
+        tuple: (sound_file, offset_seconds from the sequence start) or None
+    """
+    sounds = [sound for sound in mc.ls(type='audio') if mc.getAttr(sound + '.filename')]
+    if not sounds:
+        return None
+    if len(sounds) > 1:
+        print(f"⚠ {len(sounds)} audio nodes in the scene, review movie without sound")
+        return None
+
+    sound = sounds[0]
+    return mc.getAttr(sound + '.filename'), (mc.getAttr(sound + '.offset') - start) / fps
+
+
+def create_sequence_review(output_video, profile=None):
+    """
+    One capture of the camera sequencer gives the sequence movie and a movie per shot.
+
+    The captured frames are encoded once with keyframes forced at every shot cut,
+    so each shot is then cut out with a stream copy (no re-encode). Shot movies are written next
+    to the sequence movie as <name>_<shot><ext>.
+
+    Returns:
+        dict: {'movie': path, 'shots': {shot_name: path}, 'cuts': shots info} or {} if failed
+    """
+    # Create folder if needed
+    if not os.path.exists(os.path.dirname(output_video)):
+        os.makedirs(os.path.dirname(output_video))
+
+    seq_manager = mc.sequenceManager(q=True, node=True)
+    sequencer = mc.listConnections(seq_manager, type='sequencer')[0]
+    start = mc.getAttr(sequencer + '.minFrame')
+    end = mc.getAttr(sequencer + '.maxFrame')
+
+    # Shot boundaries recorded before capture, in seconds from the start of the movie
+    shots = get_sequencer_shots()
+    fps = mm.eval('currentTimeUnitToFPS()')
+    for shot in shots:
+        shot['start_time'] = (shot['seq_start'] - start) / fps
+        shot['duration'] = (shot['seq_end'] - shot['seq_start'] + 1) / fps
+
+    # Frames captured through the sequencer and encoded once, with the cuts as keyframes
+    capture_info = capture.capture_viewport_sequence(start, end, width=1280, height=720, sequence_time=True)
+
+    if not capture_info['files']:
+        return {}
+
+    success = video_encoder.encode_with_keyframes(
+        capture_info['pattern'],
+        output_video,
+        [shot['start_time'] for shot in shots],
+        profile=profile or video_encoder.DEFAULT_PROFILE,
+        framerate=fps,
+        audio=_sequence_audio(start, fps))
+
+    # Cleanup
+    capture.cleanup_capture_files(capture_info)
+
+    if not success:
+        return {}
+
+    base_path, ext = os.path.splitext(output_video)
+    segments = {f"{base_path}_{shot['name']}{ext}": (shot['start_time'], shot['duration']) for shot in shots}
+    written = set(video_encoder.split_movie(output_video, segments))
+
+    shot_movies = {}
+    for shot in shots:
+        path = f"{base_path}_{shot['name']}{ext}"
+        if path in written:
+            shot_movies[shot['name']] = path
+
+    return {
+        'movie': output_video,
+        'shots': shot_movies,
+        'cuts': shots
+    }
+
+
+def _stream_viewport(outputs, poster_path=None, capture_options=None):
+    """
+    Capture the viewport straight into one ffmpeg process that encodes every output
+    (see video_encoder.StreamEncoder), no frames are written to disk
+
+    Args:
+        outputs (dict): {name: (output_path, profile)}, 'movie' included
+        poster_path (str): Optional .jpg of the middle frame
+        capture_options (dict): capture_viewport_sequence args. Frame range, resolution,
+            percent, textures and display_appearance are used; every frame is captured
+            (no frame_step) and there are no intermediate images (no image_format)
+
+    Returns:
+        dict: Manifest {name: output_path} ('poster' included), empty dict if failed
+    """
+    options = capture_options or {}
+    start_frame = options.get('start_frame')
+    if start_frame is None:
+        start_frame = mc.playbackOptions(query=True, minTime=True)
+    end_frame = options.get('end_frame')
+    if end_frame is None:
+        end_frame = mc.playbackOptions(query=True, maxTime=True)
+
+    percent = options.get('percent', 100)
+    width = options.get('width', 1920) * percent // 100
+    height = options.get('height', 1080) * percent // 100
+
+    movie_path, profile = outputs['movie']
+    extra_outputs = {name: output for name, output in outputs.items() if name != 'movie'}
+
+    frames = capture.iter_viewport_frames(start_frame, end_frame, width, height,
+                                          textures=options.get('textures', True),
+                                          display_appearance=options.get('display_appearance', 'smoothShaded'))
+    encoder = None
+
+    try:
+        for frame, frame_width, frame_height, pixels in frames:
+            # Encoder starts with the first frame, once the readback size is known
+            if encoder is None:
+                encoder = video_encoder.StreamEncoder(movie_path, frame_width, frame_height, profile=profile,
+                                                      outputs=extra_outputs, poster_path=poster_path,
+                                                      poster_frame=int(end_frame - start_frame) // 2)
+            encoder.write(pixels)
+    except Exception:
+        if encoder:
+            encoder.abort()
+        raise
+
+    if encoder is None or not encoder.close():
+        return {}
+
+    return encoder.manifest()
+
+
 def _copy_to_movies(capture_info, output_video):
 
     shutil.copy2(capture_info["files"], output_video)
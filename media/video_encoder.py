@@ -3,56 +3,202 @@ import subprocess
 import os
 import tempfile
 import re
-import glob
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from . import frame_proxies
+from . import frame_sequence
+from ..core import workspace
+import importlib
+importlib.reload(frame_proxies)
+importlib.reload(frame_sequence)
 
 
-def images_to_video(source, output_path, source_type = 'playblast'):
+# Encoding profiles. Pick one per task step (see playblast_tool.STEP_PROFILES)
+#   codec / preset / crf / tune / threads: ffmpeg video encoder settings (threads 0 = auto)
+#   scale: (width, height) the frames are fitted and padded into
+#   burn_in: draw the frame number on the top right corner
+#   extra: any other output args for that profile
+ENCODING_PROFILES = {
+    'draft': {
+        'codec': 'libx264',
+        'preset': 'ultrafast',
+        'crf': 26,
+        'tune': 'fastdecode',
+        'threads': 0,
+        'scale': (1280, 720),
+        'pix_fmt': 'yuv420p',
+        'burn_in': True,
+        'extra': [],
+    },
+    'review': {
+        'codec': 'libx264',
+        'preset': 'veryfast',
+        'crf': 20,
+        'tune': 'animation',
+        'threads': 0,
+        'scale': (1920, 1080),
+        'pix_fmt': 'yuv420p',
+        'burn_in': True,
+        'extra': [],
+    },
+    'final': {
+        'codec': 'libx264',
+        'preset': 'slow',
+        'crf': 18,
+        'tune': None,
+        'threads': 0,
+        'scale': (1920, 1080),
+        'pix_fmt': 'yuv420p',
+        'burn_in': True,
+        'extra': [],
+    },
+    # Small progressive download version for browsers / mobile review
+    'web': {
+        'codec': 'libx264',
+        'preset': 'medium',
+        'crf': 23,
+        'tune': None,
+        'threads': 0,
+        'scale': (1280, 720),
+        'pix_fmt': 'yuv420p',
+        'burn_in': False,
+        'extra': ['-movflags', '+faststart'],
+    },
+    # Same MJPEG as RV, used for render folders
+    'mjpeg': {
+        'codec': 'mjpeg',
+        'preset': None,
+        'crf': None,
+        'tune': None,
+        'threads': 0,
+        'scale': (1920, 1080),
+        'pix_fmt': 'yuvj420p',  # Full range JPEG
+        'burn_in': False,
+        'extra': [
+            '-q:v', '2',  # Calidad para MJPEG (1-31, menor es mejor)
+            '-color_range', 'jpeg',  # Full range
+            '-colorspace', 'bt470bg',  # Rec601 (bt470bg es equivalente)
+            '-color_primaries', 'bt470bg',
+            '-color_trc', 'bt709',
+        ],
+    },
+}
+
+DEFAULT_PROFILE = 'final'
+
+# Chunked encoding for long sequences: segments are a whole number of GOPs,
+# encoded in parallel ffmpeg processes and joined with the concat demuxer (stream copy)
+GOP_SIZE = 48
+CHUNK_MIN_FRAMES = 1000
+CHUNK_GOPS = 10
+MAX_PARALLEL_ENCODES = max(1, min(8, (os.cpu_count() or 2) // 2))
+
+# Codecs whose segments can be joined with a stream copy (mjpeg is intra only)
+CHUNK_CODECS = ('libx264', 'mjpeg')
+
+
+def get_profile(profile):
+    """Return profile settings by name (or the dict itself if one is passed)"""
+    if isinstance(profile, dict):
+        return profile
+    if profile not in ENCODING_PROFILES:
+        raise ValueError(f"Unknown encoding profile '{profile}'. Available: {', '.join(ENCODING_PROFILES)}")
+    return ENCODING_PROFILES[profile]
+
+
+def build_video_filter(profile, pre_filters=None, frame_offset=0):
+    """
+    Build the -vf chain for a profile: optional pre filters, fit + pad into the profile
+    resolution and the frame number burn-in
+
+    Args:
+        frame_offset (int): Added to the burnt frame number, so a segment starting
+            at frame index N shows the same number as a single pass encode
+    """
+    settings = get_profile(profile)
+    width, height = settings['scale']
+
+    filters = list(pre_filters or [])
+    filters.append(f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2")
+    if settings['burn_in']:
+        if frame_offset:
+            filters.append(f"drawtext=text='Frame %{{eif\\:n+{int(frame_offset)}\\:d}}':fontcolor=white:x=w-tw-10:y=10")
+        else:
+            filters.append("drawtext=text='Frame %{n}':fontcolor=white:x=w-tw-10:y=10")
+
+    return ','.join(filters)
+
+
+def build_encoding_args(profile):
+    """Build the ffmpeg output args (codec, preset, crf, tune, threads, pix_fmt) for a profile"""
+    settings = get_profile(profile)
+
+    args = ['-c:v', settings['codec']]
+    if settings['preset']:
+        args += ['-preset', settings['preset']]
+    if settings['crf'] is not None:
+        args += ['-crf', str(settings['crf'])]
+    if settings['tune']:
+        args += ['-tune', settings['tune']]
+    if settings['threads'] is not None:
+        args += ['-threads', str(settings['threads'])]
+    args += ['-pix_fmt', settings['pix_fmt']]
+    args += settings['extra']
+
+    return args
+
+
+def images_to_video(source, output_path, source_type = 'playblast', profile=None):
     """
     Convert image sequence to video using ffmpeg
     
     Args:
         image_sequence_pattern (str): Path pattern (e.g., "/path/frame.%04d.png" or list of files)
         output_path (str): Output video path
+        profile (str): Encoding profile name from ENCODING_PROFILES. Defaults to
+            DEFAULT_PROFILE for playblasts and 'mjpeg' for folders
         
     Returns:
         bool: Success
     """
     if source_type=='playblast':
-        return _image_sequence_to_video(source, output_path)
+        return _image_sequence_to_video(source, output_path, profile or DEFAULT_PROFILE)
     elif source_type=='folder':
-        return _images_list_to_video(source, output_path)
+        return _images_list_to_video(source, output_path, profile or 'mjpeg')
 
 
-def _image_sequence_to_video(pattern, output_path):
+def _detect_sequence(pattern):
+    """
+    Find first frame and frame count of a numbered sequence pattern
 
-    # 1. Detectar el primer frame de la secuencia
-    # Convertir pattern de FFmpeg a glob: "path.%04d.png" → "path.*.png"
-    glob_pattern = re.sub(r'%\d*d', '*', pattern)
-    matching_files = sorted(glob.glob(glob_pattern))
-    
-    if not matching_files:
-        print(f"❌ No se encontraron archivos con pattern: {glob_pattern}")
-        return False
-    
-    # Extraer número del primer archivo
-    first_file = matching_files[0]
-    filename = os.path.basename(first_file)
-    
-    # Buscar números en el nombre del archivo
-    numbers = re.findall(r'\d+', filename)
-    
-    if not numbers:
-        print(f"❌ No se encontró número de frame en: {filename}")
+    Returns:
+        tuple: (start_frame, frame_count) or (None, 0) if nothing found
+    """
+
+    sequence = frame_sequence.find_sequence(pattern)
+
+    if not sequence:
+        print(f"❌ No se encontraron archivos con pattern: {pattern}")
+        return None, 0
+
+    print(f"✓ Detectado start frame: {sequence.start}")
+    print(f"✓ Total frames: {len(sequence)}")
+    if sequence.gaps:
+        print(f"⚠ Faltan {len(sequence.gaps)} frames: {sequence.gaps[:10]}")
+
+    return sequence.start, len(sequence)
+
+
+def _image_sequence_to_video(pattern, output_path, profile=DEFAULT_PROFILE):
+
+    start_frame, frame_count = _detect_sequence(pattern)
+    if not frame_count:
         return False
-    
-    # El último número suele ser el frame number
-    start_frame = int(numbers[-1])
-    
-    print(f"✓ Detectado start frame: {start_frame}")
-    print(f"✓ Total frames: {len(matching_files)}")
 
-    vf = "scale=1920:1080:force_original_aspect_ratio=decrease,pad=1920:1080:(ow-iw)/2:(oh-ih)/2," \
-    "drawtext=text='Frame %{n}':fontcolor=white:x=w-tw-10:y=10"
+    if frame_count >= CHUNK_MIN_FRAMES and get_profile(profile)['codec'] in CHUNK_CODECS:
+        return _encode_sequence_in_chunks(pattern, start_frame, frame_count, output_path, profile)
+
+    vf = build_video_filter(profile)
 
     """Convert numbered sequence to video"""
     cmd = [
@@ -61,10 +207,7 @@ def _image_sequence_to_video(pattern, output_path):
         '-start_number',str(start_frame),
         '-framerate', '24',
         '-i', pattern,
-        '-c:v', 'libx264',
-        '-crf', '18',
-        '-preset', 'slow',
-        '-pix_fmt', 'yuv420p',
+        *build_encoding_args(profile),
         '-vf', vf,
         output_path
     ]
@@ -76,27 +219,359 @@ def _image_sequence_to_video(pattern, output_path):
         print(f"FFmpeg error: {e.stderr.decode()}")
         return False
     
-def _images_list_to_video(image_folder, output_path):
+def images_to_review_media(pattern, outputs, poster_path=None, poster_frame=None):
+    """
+    Encode several outputs from a single decode of a numbered sequence: one ffmpeg
+    process splits the decoded frames to every output (movie, proxy, web, poster).
+
+    Args:
+        pattern (str): ffmpeg sequence pattern ("/path/frame.%04d.png")
+        outputs (dict): {name: (output_path, profile)}, ej:
+            {'movie': ('/x/shot.mov', 'review'), 'web': ('/x/shot_web.mp4', 'web')}
+        poster_path (str): Optional .jpg with one representative frame
+        poster_frame (int): Frame index for the poster, middle frame by default
+
+    Returns:
+        dict: Manifest {name: output_path} of everything generated ('poster' included),
+            empty dict on failure
+    """
+    start_frame, frame_count = _detect_sequence(pattern)
+    if not frame_count:
+        return {}
+
+    if poster_path and poster_frame is None:
+        poster_frame = frame_count // 2
+
+    cmd = [
+        'ffmpeg',
+        '-y',
+        '-start_number', str(start_frame),
+        '-framerate', '24',
+        '-i', pattern,
+        *_split_outputs_args(outputs, poster_path, poster_frame)
+    ]
+
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+    except subprocess.CalledProcessError as e:
+        print(f"FFmpeg error: {e.stderr.decode()}")
+        return {}
+
+    return _outputs_manifest(outputs, poster_path)
+
+
+def _split_outputs_args(outputs, poster_path=None, poster_frame=0, pre_filters=None):
+    """
+    ffmpeg args that split input 0 to every output and the poster
+
+    Args:
+        outputs (dict): {name: (output_path, profile)}
+        poster_path (str): Optional .jpg of frame poster_frame
+        pre_filters (list): Filters applied once, before the split (ej: ['vflip'])
+
+    Returns:
+        list: -filter_complex and the -map/encoding args of every output
+    """
+    branches = len(outputs) + (1 if poster_path else 0)
+    labels = [f"v{i}" for i in range(branches)]
+
+    split = ','.join([*(pre_filters or []), f"split={branches}"])
+    graph = [f"[0:v]{split}" + ''.join(f"[{label}]" for label in labels)]
+    output_args = []
+
+    for label, (name, (output_path, profile)) in zip(labels, outputs.items()):
+        graph.append(f"[{label}]{build_video_filter(profile)}[{name}]")
+        output_args += ['-map', f"[{name}]", *build_encoding_args(profile), output_path]
+
+    if poster_path:
+        graph.append(f"[{labels[-1]}]select='eq(n\\,{int(poster_frame)})',scale=1920:-2[poster]")
+        output_args += ['-map', '[poster]', '-frames:v', '1', '-q:v', '2', poster_path]
+
+    return ['-filter_complex', ';'.join(graph), *output_args]
+
+
+def _outputs_manifest(outputs, poster_path=None):
+    manifest = {name: output_path for name, (output_path, _) in outputs.items()}
+    if poster_path:
+        manifest['poster'] = poster_path
+
+    return manifest
+
+
+def scene_change_scores(pattern, scale_width=160):
+    """
+    Scene change score of every frame (0-1, ffmpeg 'scene' metric) on a small
+    downscaled decode of the sequence
+
+    Returns:
+        list: One score per frame (frame index order), empty list on failure
+    """
+    start_frame, frame_count = _detect_sequence(pattern)
+    if not frame_count:
+        return []
+
+    cmd = [
+        'ffmpeg',
+        '-start_number', str(start_frame),
+        '-i', pattern,
+        '-vf', f"scale={scale_width}:-2,select='gte(scene,0)',metadata=print:key=lavfi.scene_score",
+        '-an',
+        '-f', 'null',
+        '-'
+    ]
+
+    try:
+        result = subprocess.run(cmd, check=True, capture_output=True)
+    except subprocess.CalledProcessError as e:
+        print(f"FFmpeg error: {e.stderr.decode()}")
+        return []
+
+    scores = [float(value) for value in re.findall(r'lavfi\.scene_score=([0-9.]+)', result.stderr.decode(errors='replace'))]
+
+    return scores
+
+
+def encode_with_keyframes(pattern, output_path, keyframe_times, profile=DEFAULT_PROFILE, framerate=24, audio=None):
+    """
+    Encode a numbered image sequence forcing keyframes at the given times (seconds),
+    so the movie can be split there later with stream copies (see split_movie).
+    Frames are encoded once, straight from the capture.
+
+    Args:
+        pattern (str): Numbered image sequence (ej: wknd_capture.%04d.png)
+        keyframe_times (list): Seconds from the first frame
+        framerate (float): Sequence frame rate
+        audio (tuple): Optional (sound_file, offset_seconds), offset of the sound from the first frame
+
+    Returns:
+        bool: Success
+    """
+    start_frame, frame_count = _detect_sequence(pattern)
+    if not frame_count:
+        return False
+
+    cmd = [
+        'ffmpeg',
+        '-y',
+        '-start_number', str(start_frame),
+        '-framerate', str(framerate),
+        '-i', pattern,
+    ]
+    if audio:
+        sound_file, offset = audio
+        # Sound starting before the first frame is trimmed, starting after it is delayed
+        seek = ['-ss', f"{-offset:.6f}"] if offset < 0 else ['-itsoffset', f"{offset:.6f}"]
+        cmd += [*seek, '-i', sound_file, '-map', '0:v', '-map', '1:a', '-c:a', 'aac',
+                '-t', f"{frame_count / framerate:.6f}"]
+
+    cmd += [
+        *build_encoding_args(profile),
+        '-vf', build_video_filter(profile),
+        '-force_key_frames', ','.join(f"{t:.6f}" for t in keyframe_times) or '0',
+        output_path
+    ]
+
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"FFmpeg error: {e.stderr.decode()}")
+        return False
+
+
+def split_movie(source, segments):
+    """
+    Cut segments out of a movie without re-encoding (stream copy). Segment starts
+    must be on keyframes (see encode_with_keyframes) for frame accurate cuts.
+
+    Args:
+        source (str): Movie to split
+        segments (dict): {output_path: (start_seconds, duration_seconds)}
+
+    Returns:
+        list: Output paths written successfully
+    """
+    def _cut(item):
+        output_path, (start, duration) = item
+        cmd = [
+            'ffmpeg',
+            '-y',
+            '-ss', f"{start:.6f}",
+            '-i', source,
+            '-t', f"{duration:.6f}",
+            '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero',
+            output_path
+        ]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            print(f"FFmpeg error ({output_path}): {result.stderr.decode()}")
+            return None
+        return output_path
+
+    # Stream copies are I/O bound, a few at a time
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_ENCODES) as pool:
+        results = list(pool.map(_cut, segments.items()))
+
+    return [path for path in results if path]
+
+
+def _encode_sequence_in_chunks(pattern, start_frame, frame_count, output_path, profile):
+    """
+    Encode a long numbered sequence as GOP aligned segments in parallel ffmpeg
+    processes, then join them losslessly with the concat demuxer.
+
+    Returns:
+        bool: Success
+    """
+    chunk_frames = GOP_SIZE * CHUNK_GOPS
+
+    segments = []
+    for offset in range(0, frame_count, chunk_frames):
+        input_args = [
+            '-start_number', str(start_frame + offset),
+            '-framerate', '24',
+            '-i', pattern,
+            '-frames:v', str(min(chunk_frames, frame_count - offset)),
+        ]
+        segments.append((input_args, offset))
+
+    return _encode_segments(segments, output_path, profile)
+
+
+def _encode_segments(segments, output_path, profile, segments_dir=None):
+    """
+    Encode segments in parallel ffmpeg processes and join them with the concat demuxer (stream copy)
+
+    Args:
+        segments (list): (ffmpeg input args, index of its first frame) per segment, in order
+        segments_dir (str): Scratch folder of the segments (removed at the end), a new one by default
+
+    Returns:
+        bool: Success
+    """
+    segments_dir = segments_dir or workspace.scratch_dir('segments')
+    extension = os.path.splitext(output_path)[1] or '.mp4'
+
+    # Split cores between the parallel encodes (instead of the profile threads)
+    settings = dict(get_profile(profile), threads=max(1, (os.cpu_count() or 2) // MAX_PARALLEL_ENCODES))
+    encoding_args = [*build_encoding_args(settings), '-g', str(GOP_SIZE)]
+
+    commands = []
+    for index, (input_args, frame_offset) in enumerate(segments):
+        segment_path = os.path.join(segments_dir, f"segment_{index:04d}{extension}")
+        cmd = [
+            'ffmpeg',
+            '-y',
+            *input_args,
+            *encoding_args,
+            '-vf', build_video_filter(settings, frame_offset=frame_offset),
+            segment_path
+        ]
+        commands.append((segment_path, cmd))
+
+    print(f"✓ Encoding {len(commands)} segments ({MAX_PARALLEL_ENCODES} parallel)")
+
+    def _run(cmd):
+        return subprocess.run(cmd, capture_output=True)
+
+    try:
+        # ffmpeg does the work in its own process, threads here only wait on them
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_ENCODES) as pool:
+            results = list(pool.map(_run, [cmd for _, cmd in commands]))
+
+        for result in results:
+            if result.returncode != 0:
+                print(f"FFmpeg error: {result.stderr.decode()}")
+                return False
+
+        concat_file = os.path.join(segments_dir, "segments.txt")
+        with open(concat_file, 'w') as f:
+            for segment_path, _ in commands:
+                f.write(f"file '{segment_path}'\n")
+
+        cmd = [
+            'ffmpeg',
+            '-y',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', concat_file,
+            '-c', 'copy',
+            output_path
+        ]
+        subprocess.run(cmd, check=True, capture_output=True)
+        return True
+
+    except subprocess.CalledProcessError as e:
+        print(f"FFmpeg error: {e.stderr.decode()}")
+        return False
+    finally:
+        shutil.rmtree(segments_dir, ignore_errors=True)
+
+
+def _write_concat_list(concat_file, image_paths, frame_holds):
+    """ffmpeg concat demuxer list: every image with its duration (held frames)"""
+    with open(concat_file, 'w') as f:
+        for img, hold in zip(image_paths, frame_holds):
+            f.write(f"file '{img}'\n")
+            f.write(f"duration {hold/24}\n")
+        f.write(f"file '{image_paths[-1]}'\n")  # Last frame
+
+
+def _images_list_to_video(image_folder, output_path, profile='mjpeg', use_proxies=True):
     """Convert list of images to video using concat"""
     # Create concat file
 
-    image_paths = list()
-    image_files = os.listdir(image_folder)
-    valid_extensions = ['.exr', '.png', '.jpg']
-    for img in image_files:
-        if img.lower().endswith(tuple(valid_extensions)):
-            image_paths.append(os.path.join(image_folder, img))
+    # One scandir pass, frames grouped by sequence and sorted by frame number
+    sequences = frame_sequence.scan_sequences(image_folder, ('.exr', '.png', '.jpg'))
+    if not sequences:
+        print(f"❌ No image sequence found in {image_folder}")
+        return False
+
+    # Several AOVs / sequences in the folder: use the longest one
+    sequence = sequences[0]
+    for other in sequences[1:]:
+        print(f"⚠ Ignored sequence: {other}")
+    print(f"✓ {sequence}")
+
+    image_paths = sequence.paths()
+
+    # Missing frames hold the previous one, so timing matches the frame numbers
+    frame_holds = [next_frame - frame for frame, next_frame in zip(sequence.frames, sequence.frames[1:])] + [1]
+
+    # Decode big EXRs once, in parallel, into cached 8-bit proxies
+    if use_proxies and image_paths:
+        proxy_paths = frame_proxies.build_proxies(image_paths)
+        if proxy_paths is None:
+            print("❌ Proxy conversion failed")
+            return False
+        image_paths = proxy_paths
      
-    temp_dir = os.path.realpath(tempfile.gettempdir())
-    concat_file = os.path.join(temp_dir, "ffmpeg_concat.txt")
+    concat_dir = workspace.scratch_dir('concat')
+
+    # Long folders: one concat list per segment, encoded in parallel like _encode_sequence_in_chunks
+    if len(image_paths) >= CHUNK_MIN_FRAMES and get_profile(profile)['codec'] in CHUNK_CODECS:
+        chunk_frames = GOP_SIZE * CHUNK_GOPS
+        segments = []
+        for index, offset in enumerate(range(0, len(image_paths), chunk_frames)):
+            segment_list = os.path.join(concat_dir, f"segment_{index:04d}.txt")
+            chunk = image_paths[offset:offset + chunk_frames]
+            _write_concat_list(segment_list, chunk, frame_holds[offset:offset + chunk_frames])
+            input_args = ['-f', 'concat', '-safe', '0', '-i', segment_list]
+            # Only the last segment keeps the repeated last frame of the list
+            if offset + chunk_frames < len(image_paths):
+                input_args += ['-frames:v', str(len(chunk))]
+            segments.append((input_args, offset))
+
+        try:
+            return _encode_segments(segments, output_path, profile)
+        finally:
+            shutil.rmtree(concat_dir, ignore_errors=True)
+
+    concat_file = os.path.join(concat_dir, "ffmpeg_concat.txt")
     
     try:
-        with open(concat_file, 'w') as f:
-            for img in image_paths:
-                print (img)
-                f.write(f"file '{img}'\n")
-                f.write(f"duration {1.0/24}\n")
-            f.write(f"file '{image_paths[-1]}'\n")  # Last frame
+        _write_concat_list(concat_file, image_paths, frame_holds)
         
         cmd = [
             'ffmpeg',
@@ -104,14 +579,8 @@ def _images_list_to_video(image_folder, output_path):
             '-f', 'concat',
             '-safe', '0',
             '-i', concat_file,
-            '-c:v', 'mjpeg',  # Cambiar a MJPEG como RV
-            '-q:v', '2',  # Calidad para MJPEG (1-31, menor es mejor)
-            '-pix_fmt', 'yuvj420p',  # Full range JPEG
-            '-vf', 'scale=1920:1080:force_original_aspect_ratio=decrease,pad=1920:1080:(ow-iw)/2:(oh-ih)/2',
-            '-color_range', 'jpeg',  # Full range
-            '-colorspace', 'bt470bg',  # Rec601 (bt470bg es equivalente)
-            '-color_primaries', 'bt470bg',
-            '-color_trc', 'bt709',
+            *build_encoding_args(profile),
+            '-vf', build_video_filter(profile),
             output_path
         ]
 
@@ -122,8 +591,97 @@ def _images_list_to_video(image_folder, output_path):
         print(f"FFmpeg error: {e.stderr.decode()}")
         return False
     finally:
-        if os.path.exists(concat_file):
-            try:
-                os.remove(concat_file)
-            except:
-                pass
\ No newline at end of file
+        shutil.rmtree(concat_dir, ignore_errors=True)
+
+
+class StreamEncoder:
+    """
+    Persistent ffmpeg process fed with raw frames through stdin.
+
+    Frames go straight from the viewport to the encoder, so there is no PNG
+    compress/decompress nor disk round trip, and encoding overlaps with capture.
+    Like images_to_review_media, extra outputs and a poster can be encoded from
+    the same frames in the same process.
+
+    Usage:
+        with StreamEncoder(output_path, width, height) as encoder:
+            encoder.write(frame_bytes)
+        encoder.success
+    """
+
+    def __init__(self, output_path, width, height, framerate=24, pix_fmt='rgba', vflip=True, profile=DEFAULT_PROFILE,
+                 outputs=None, poster_path=None, poster_frame=0):
+        """
+        Args:
+            output_path (str): Movie, encoded with profile
+            width (int): Frame width of the raw frames
+            height (int): Frame height of the raw frames
+            outputs (dict): Extra {name: (output_path, profile)}, ej: proxy and web mp4
+            poster_path (str): Optional .jpg of frame index poster_frame
+        """
+
+        self.output_path = output_path
+        self.outputs = {'movie': (output_path, profile), **(outputs or {})}
+        self.poster_path = poster_path
+        self.width = width
+        self.height = height
+        self.frame_count = 0
+        self.success = False
+
+        cmd = [
+            'ffmpeg',
+            '-y',
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', pix_fmt,
+            '-s', f'{width}x{height}',
+            '-framerate', str(framerate),
+            '-i', '-',
+            *_split_outputs_args(self.outputs, poster_path, poster_frame, pre_filters=['vflip'] if vflip else None)
+        ]
+
+        # stderr to a file so a chatty ffmpeg can never block on a full pipe
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr)
+
+    def manifest(self):
+        """{name: output_path} of everything encoded ('movie', extra outputs and 'poster')"""
+        return _outputs_manifest(self.outputs, self.poster_path)
+
+    def write(self, frame_bytes):
+        """Send one raw frame to ffmpeg (blocks if the encoder is behind)"""
+        self._process.stdin.write(frame_bytes)
+        self.frame_count += 1
+
+    def close(self):
+        """Flush, wait for ffmpeg and return success"""
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+        return_code = self._process.wait()
+        self.success = return_code == 0 and self.frame_count > 0
+
+        if return_code != 0:
+            self._stderr.seek(0)
+            print(f"FFmpeg error: {self._stderr.read().decode(errors='replace')}")
+        self._stderr.close()
+
+        return self.success
+
+    def abort(self):
+        """Kill ffmpeg, the partial output is not valid"""
+        self._process.kill()
+        self.close()
+        self.success = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+        return False
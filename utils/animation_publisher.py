@@ -3,7 +3,10 @@ import maya.OpenMayaUI as omui
 import sgtk
 import maya.cmds as cmds
 import maya.cmds as mc
+import os
 from ..core import exporters
+from ..core import fingerprint
+from ..core import transfer
 
 try:
     from PySide6 import QtWidgets as qt
@@ -122,6 +125,44 @@ def get_characters_and_props():
     return results
 
 
+# Fichero junto a cada alembic con el fingerprint de la animacion que lo genero
+FINGERPRINT_SUFFIX = '.fingerprint'
+
+
+def read_cache_fingerprint(abc_path):
+    """Fingerprint guardado junto al alembic, None si no hay."""
+    try:
+        with open(abc_path + FINGERPRINT_SUFFIX, 'r') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_cache_fingerprint(abc_path, anim_fingerprint):
+    """Guarda el fingerprint junto al alembic."""
+    if anim_fingerprint:
+        with open(abc_path + FINGERPRINT_SUFFIX, 'w') as f:
+            f.write(anim_fingerprint)
+
+
+def get_last_cache(tk, template, fields):
+    """
+    Ultimo alembic publicado de este asset (la version mas alta en disco).
+
+    Args:
+        tk: Sgtk
+        template: Template de los caches de animacion
+        fields (dict): Fields del cache actual (se ignora la version)
+
+    Returns:
+        str: Path del ultimo alembic o None
+    """
+    paths = tk.paths_from_template(template, fields, skip_keys=['version'])
+    if not paths:
+        return None
+    return max(paths, key=lambda path: template.get_fields(path).get('version', 0))
+
+
 class AnimationPublisherUI(MayaQWidgetDockableMixin, qt.QDialog):
     """
     UI para seleccionar y publicar animaciones de characters y props.
@@ -295,6 +336,8 @@ class AnimationPublisherUI(MayaQWidgetDockableMixin, qt.QDialog):
         
         template = tk.templates["maya_shot_anim_assets_abc_publish"]
         
+        exported, copied, skipped = [], [], []
+        
         for asset in selected_assets:
             ns = f"[{asset['namespace']}]" if asset['namespace'] else ""
             print(f"  • {asset['group']}: {asset['name']} {ns} (full: {asset['full_name']})")
@@ -310,16 +353,45 @@ class AnimationPublisherUI(MayaQWidgetDockableMixin, qt.QDialog):
             frame_in = 1000
             frame_out = int(mc.playbackOptions(q=1, max=1)) + 1
             
+            # Solo se recachea si la animacion (curvas, referencia, rango) cambio desde el ultimo alembic
+            anim_fingerprint = fingerprint.animation_hash(geo_to_export, (frame_in, frame_out))
+            last_cache = get_last_cache(tk, template, scene_fields)
+            
+            if anim_fingerprint and last_cache and read_cache_fingerprint(last_cache) == anim_fingerprint:
+                
+                if os.path.normpath(last_cache) == os.path.normpath(ma_path):
+                    print(f"    = Sin cambios, se mantiene {ma_path}")
+                    skipped.append(asset['name'])
+                    continue
+                
+                # Copia (reflink si se puede), un hard link compartiria el alembic publicado
+                # con la siguiente exportacion de esta version
+                transfer.copy_file(last_cache, ma_path)
+                write_cache_fingerprint(ma_path, anim_fingerprint)
+                print(f"    = Sin cambios, copiado desde {last_cache}")
+                copied.append(asset['name'])
+                continue
+            
+            # El fingerprint viejo no debe quedar junto a un alembic a medio escribir
+            if os.path.exists(ma_path + FINGERPRINT_SUFFIX):
+                os.remove(ma_path + FINGERPRINT_SUFFIX)
+            
+            # Un alembic enlazado por versiones anteriores no se reescribe en el sitio
+            if os.path.exists(ma_path):
+                os.remove(ma_path)
+            
             exporters.export_alembic(geo_to_export , ma_path, frame_in, frame_out)
+            write_cache_fingerprint(ma_path, anim_fingerprint)
+            exported.append(asset['name'])
         
         print("="*60)
-        print(f"Total: {len(selected_assets)} assets\n")
+        print(f"Total: {len(selected_assets)} assets ({len(exported)} cacheados, {len(copied)} copiados, {len(skipped)} sin cambios)\n")
         
-        # Aquí irá la lógica de export de alembic
         qt.QMessageBox.information(
             self, 
             "Publish", 
-            f"Se publicarán {len(selected_assets)} assets.\n(Ver consola para detalles)"
+            f"Se publicarán {len(selected_assets)} assets.\n"
+            f"Cacheados: {len(exported)} / Copiados: {len(copied)} / Sin cambios: {len(skipped)}\n(Ver consola para detalles)"
         )
 
 
@@ -1,14 +1,30 @@
 import maya.cmds as cmds
-
-def _get_camera_keyframes_by_frame(camera_name):
+import maya.api.OpenMaya as om2
+import numpy as np
+
+# Canales muestreados: (nodo, atributo). El orden define las columnas del array
+CAMERA_CHANNELS = [
+    ('transform', 'translateX'), ('transform', 'translateY'), ('transform', 'translateZ'),
+    ('transform', 'rotateX'), ('transform', 'rotateY'), ('transform', 'rotateZ'),
+    ('shape', 'focalLength'),
+    ('shape', 'focusDistance'),
+    ('shape', 'fStop'),
+]
+
+# Columnas que cuentan como movimiento de cámara (fStop no)
+TRANSLATE_COLUMNS = slice(0, 3)
+ROTATE_COLUMNS = slice(3, 6)
+ZOOM_COLUMN = 6
+FOCUS_COLUMN = 7
+MOVEMENT_THRESHOLD = 1e-4
+
+
+def _get_camera_nodes(camera_name):
     """
-    Obtiene todos los keyframes de una cámara organizados por frame
+    Devuelve (transform, shape) de una cámara
 
     Args:
         camera_name: Nombre de la cámara (puede ser el transform o el shape)
-
-    Returns:
-        dict: {camera_name: {frame: [values]}}
     """
 
     # Si es un shape, obtener el transform
@@ -20,135 +36,123 @@ def _get_camera_keyframes_by_frame(camera_name):
     # Obtener el shape de la cámara
     camera_shape = cmds.listRelatives(camera_transform, shapes=True)[0]
 
-    # Atributos a consultar
-    transform_attrs = [
-        'translateX', 'translateY', 'translateZ',
-        'rotateX', 'rotateY', 'rotateZ'
-    ]
-
-    camera_attrs = [
-        'focalLength',
-        'focusDistance',
-        'fStop',
-    ]
+    return camera_transform, camera_shape
 
-    # Recopilar todos los frames únicos que tienen keyframes
-    all_frames = set()
-
-    # Obtener frames de transformación
-    for attr in transform_attrs:
-        full_attr = f"{camera_transform}.{attr}"
-        keyframes = cmds.keyframe(full_attr, query=True, timeChange=True)
-        if keyframes:
-            all_frames.update(keyframes)
 
-    # Obtener frames de atributos de cámara
-    for attr in camera_attrs:
-        full_attr = f"{camera_shape}.{attr}"
-        keyframes = cmds.keyframe(full_attr, query=True, timeChange=True)
-        if keyframes:
-            all_frames.update(keyframes)
-
-    # Ordenar frames
-    all_frames = sorted(all_frames)
-
-    # Construir el diccionario resultado
-    result = {camera_transform: {}}
-
-    for frame in all_frames:
-        result[camera_transform][frame] = {}
-
-        # Obtener valores de transformación en ese frame
-        for attr in transform_attrs:
-            full_attr = f"{camera_transform}.{attr}"
-            value = cmds.getAttr(full_attr, time=frame)
-            result[camera_transform][frame][attr] = value
-
-        # Obtener valores de cámara en ese frame
-        for attr in camera_attrs:
-            full_attr = f"{camera_shape}.{attr}"
-            value = cmds.getAttr(full_attr, time=frame)
-            result[camera_transform][frame][attr] = value
+def _get_camera_keyframes_by_frame(camera_name):
+    """
+    Obtiene todos los frames con keyframes de una cámara
 
-    return result, {camera_name: all_frames}
+    Args:
+        camera_name: Nombre de la cámara (puede ser el transform o el shape)
 
+    Returns:
+        list: frames ordenados con key en alguno de los CAMERA_CHANNELS
+    """
 
-def _define_camera_changes(cameraInfo, keyedFrames):
+    camera_transform, camera_shape = _get_camera_nodes(camera_name)
 
-    for c, keyframes in cameraInfo.items():
-        frameKeys = keyframes
-        print(frameKeys)
+    # Recopilar todos los frames únicos que tienen keyframes
+    all_frames = set()
 
-        moving = []
+    for node, attr in CAMERA_CHANNELS:
+        keyframes = cmds.keyframe(f"{nodes[node]}.{attr}", query=True, timeChange=True)
+        if keyframes:
+            all_frames.update(keyframes)
 
-        for frame in keyedFrames:
+    return sorted(all_frames)
 
-            keyFrameValues = keyframes[frame]
-            # Guardamos el primer frame de la cadena
-            if frame == keyedFrames[0]:
-                prevKeyFrameValues = keyFrameValues
-                prevFrame = frame
-                continue
 
-            # Calculamos distancia entre los distintos vectores #
+def _sample_camera_channels(camera_name, frames, world_space=False):
+    """
+    Evalúa todos los CAMERA_CHANNELS en todos los frames en una sola pasada
+    de API (MDGContext por frame), sin un getAttr por valor.
 
-            # Translacion
-            x_t = [prevKeyFrameValues['translateX'], prevKeyFrameValues['translateY'], prevKeyFrameValues['translateZ']]
-            y_t = [keyFrameValues['translateX'], keyFrameValues['translateY'], keyFrameValues['translateZ']]
-            traslacion = _dist(x_t, y_t)
+    Args:
+        camera_name: Nombre de la cámara (transform o shape)
+        frames: Lista o array de frames a evaluar
+        world_space: Si True, traslación y rotación salen de la worldMatrix evaluada,
+            así se detecta el movimiento de cámaras con constraints o padres animados
 
-            # Rotacion
-            x_r = [prevKeyFrameValues['rotateX'], prevKeyFrameValues['rotateY'], prevKeyFrameValues['rotateZ']]
-            y_r = [keyFrameValues['rotateX'], keyFrameValues['rotateY'], keyFrameValues['rotateZ']]
-            rotacion = _dist(x_r, y_r)
+    Returns:
+        numpy.ndarray: shape (frames, channels), en unidades de UI (como getAttr)
+    """
 
-            # Zoom
-            x_z = [prevKeyFrameValues['focalLength']]
-            y_z = [keyFrameValues['focalLength']]
-            zoom = _dist(x_z, y_z)
+    camera_transform, camera_shape = _get_camera_nodes(camera_name)
+
+    selection = om2.MSelectionList()
+    selection.add(camera_transform)
+    selection.add(camera_shape)
+    fn_nodes = {
+        'transform': om2.MFnDependencyNode(selection.getDependNode(0)),
+        'shape': om2.MFnDependencyNode(selection.getDependNode(1)),
+    }
+    plugs = [fn_nodes[node].findPlug(attr, False) for node, attr in CAMERA_CHANNELS]
+    world_matrix_plug = fn_nodes['transform'].findPlug('worldMatrix', False).elementByLogicalIndex(0)
+
+    frames = np.asarray(frames, dtype=np.float64)
+    samples = np.empty((len(frames), len(plugs)), dtype=np.float64)
+    time_unit = om2.MTime.uiUnit()
+
+    for row, frame in enumerate(frames):
+        context = om2.MDGContext(om2.MTime(float(frame), time_unit))
+        previous = context.makeCurrent()
+        try:
+            samples[row] = [plug.asDouble() for plug in plugs]
+            if world_space:
+                matrix = om2.MTransformationMatrix(om2.MFnMatrixData(world_matrix_plug.asMObject()).matrix())
+                translation = matrix.translation(om2.MSpace.kWorld)
+                rotation = matrix.rotation()
+                samples[row, TRANSLATE_COLUMNS] = [translation.x, translation.y, translation.z]
+                samples[row, ROTATE_COLUMNS] = [rotation.x, rotation.y, rotation.z]
+        finally:
+            previous.makeCurrent()
+
+    # Unidades internas (cm, radianes) -> unidades de UI
+    samples[:, TRANSLATE_COLUMNS] *= om2.MDistance(1.0).asUnits(om2.MDistance.uiUnit())
+    samples[:, ROTATE_COLUMNS] = np.degrees(samples[:, ROTATE_COLUMNS])
+
+    print(f"✓ {camera_transform}: {samples.shape[0]} frames x {samples.shape[1]} canales muestreados")
+
+    return samples
+
+
+def _define_camera_changes(frames, samples):
+    """
+    Busca los tramos en los que la cámara se mueve, vectorizado sobre todos los frames
 
-            # Focus
-            x_f = [prevKeyFrameValues['focusDistance']]
-            y_f = [keyFrameValues['focusDistance']]
-            focus = _dist(x_f, y_f)
+    Args:
+        frames: array de frames (N)
+        samples: array (N, channels) de _sample_camera_channels
 
-            if traslacion:
-                print(f"Hay TRASLACION del frame {prevFrame} al {frame}")
+    Returns:
+        list: pares [frame_previo, frame] en los que hay traslación, rotación, zoom o focus
+    """
 
-            if rotacion:
-                print(f"Hay ROTACION del frame {prevFrame} al {frame}")
+    frames = np.asarray(frames)
+    if len(frames) < 2:
+        return []
 
-            if zoom:
-                print(f"Hay ZOOM del frame {prevFrame} al {frame}")
+    # Cambios entre frames consecutivos por canal
+    changed = np.abs(np.diff(samples, axis=0)) > MOVEMENT_THRESHOLD
 
-            # if focus:
-            #     print(f"Hay FOCUS del frame {prevFrame} al {frame}")
+    traslacion = changed[:, TRANSLATE_COLUMNS].any(axis=1)
+    rotacion = changed[:, ROTATE_COLUMNS].any(axis=1)
+    zoom = changed[:, ZOOM_COLUMN]
+    focus = changed[:, FOCUS_COLUMN]
 
-            # Vemos si se cumple alguna condición #
-            if any([traslacion, rotacion, zoom, focus]):
-                moving.append([prevFrame, frame])
+    print(f"Frames con TRASLACION: {int(traslacion.sum())} | ROTACION: {int(rotacion.sum())} | ZOOM: {int(zoom.sum())}")
 
-            # Avanzamos de frame
-            prevKeyFrameValues = keyFrameValues
-            prevFrame = frame
+    # Vemos si se cumple alguna condición #
+    moving_idx = np.nonzero(traslacion | rotacion | zoom | focus)[0]
+    moving = [[float(frames[i]), float(frames[i + 1])] for i in moving_idx]
 
-        print("====== MOVING ==============\n", moving)
-        return moving
+    print("====== MOVING ==============\n", moving)
+    return moving
 
 
 # UTILS ##########
 
-def _dist(x, y):
-
-    threshold = 1e-4
-
-    if len(x) != len(y):
-        print(f"Los dos vectores no son de la misma longitud: len(x)={len(x)} | len(y)={len(y)}")
-        return False
-
-    return not all(abs(a - b) <= threshold for a, b in zip(x, y))
-
-
 def _unir_rangos(rangos):
     """
     rangos: lista de pares [inicio, fin]
@@ -176,7 +180,19 @@ def _unir_rangos(rangos):
 
 ###############################
 
-def get_camera_movement(camera):
+def get_camera_movement(camera, start_frame=None, end_frame=None, world_space=False):
+    """
+    Devuelve los rangos de frames en los que se mueve la cámara
+
+    Args:
+        camera: Nombre de la cámara (transform o shape)
+        start_frame, end_frame: Rango a muestrear. Si no se pasan, se usa
+            el rango entre la primera y la última key de la cámara
+        world_space: Evaluar la worldMatrix (constraints, padres animados)
+
+    Returns:
+        list: rangos [inicio, fin] fusionados
+    """
 
     # Para la cámara seleccionada
     # selected = cmds.ls(selection=True)
@@ -185,16 +201,25 @@ def get_camera_movement(camera):
     # else:
     #     camera = 'persp'  # Cámara por defecto
 
-    # Obtener keyframes en el formato solicitado
-    cameraInfo, keyedFrames = _get_camera_keyframes_by_frame(camera)
+    if start_frame is None or end_frame is None:
+
+        # Frames con key de la cámara
+        keyedFrames = _get_camera_keyframes_by_frame(camera)
 
-    print("========= cameraInfo =============")
-    print(cameraInfo)
+        print(f"========= keyedFrames ======= {keyedFrames}")
 
-    print(f"========= keyedFrames[camera] ======= {keyedFrames[camera]}")
+        if not keyedFrames:
+            return []
+
+        start_frame = keyedFrames[0] if start_frame is None else start_frame
+        end_frame = keyedFrames[-1] if end_frame is None else end_frame
+
+    # Muestreamos todos los frames del rango
+    frames = np.arange(np.floor(start_frame), np.ceil(end_frame) + 1)
+    samples = _sample_camera_channels(camera, frames, world_space=world_space)
 
     # Buscamos los cambios en la camara
-    movement = _define_camera_changes(cameraInfo, keyedFrames[camera])
+    movement = _define_camera_changes(frames, samples)
 
     print("========= movement =============")
     print(movement)
@@ -207,6 +232,83 @@ def get_camera_movement(camera):
 
     return finalMovement
 
+def get_sequence_camera_movement():
+    """
+    Analiza la cámara de cada shot del camera sequencer, solo dentro del rango del shot
+    y en world space (incluye cámaras con constraints o padres animados).
+
+    Returns:
+        dict: {shot_name: [[inicio, fin], ...]}
+    """
+
+    seq_manager = cmds.sequenceManager(q=True, node=True)
+    sequencer = cmds.listConnections(seq_manager, type='sequencer')[0]
+    shots = cmds.listConnections(sequencer, type="shot") or []  # Get a list of all shots from the sequencer.
+
+    sequence_movement = {}
+
+    for shot in shots:
+
+        shot_name = cmds.getAttr(f"{shot}.shotName")
+        start_frame = cmds.getAttr(f"{shot}.startFrame")
+        end_frame = cmds.getAttr(f"{shot}.endFrame")
+        shot_camera = cmds.listConnections(f"{shot}.currentCamera")
+
+        if not shot_camera:
+            print(f"⚠ {shot_name}: sin cámara, ignorado")
+            continue
+
+        sequence_movement[shot_name] = get_camera_movement(shot_camera[0], start_frame, end_frame, world_space=True)
+
+        print(f"✓ {shot_name} ({shot_camera[0]}) {start_frame}-{end_frame}: {sequence_movement[shot_name]}")
+
+    return sequence_movement
+
+
+def update_shots_camera_movement(sg, project, sequence, sequence_movement):
+    """
+    Escribe sg_cam_mov y sg_cam_mov_range de todos los shots en una sola llamada sg.batch
+
+    Args:
+        sg: Conexión a ShotGrid
+        project: Entidad Project
+        sequence: Entidad Sequence de los shots (los códigos de shot se repiten entre secuencias)
+        sequence_movement: {shot_name: rangos} de get_sequence_camera_movement
+
+    Returns:
+        list: Resultado de sg.batch
+    """
+
+    if not sequence_movement:
+        return []
+
+    shots = sg.find(
+        'Shot',
+        [['project', 'is', project],
+         ['sg_sequence', 'is', sequence],
+         ['code', 'in', list(sequence_movement)]],
+        ['code']
+    )
+
+    batch_data = []
+    for shot in shots:
+        finalMovement = sequence_movement[shot['code']]
+        batch_data.append({
+            'request_type': 'update',
+            'entity_type': 'Shot',
+            'entity_id': shot['id'],
+            'data': {
+                "sg_cam_mov": True if finalMovement else False,
+                "sg_cam_mov_range": finalMovement or []
+            }
+        })
+
+    missing = set(sequence_movement) - {shot['code'] for shot in shots}
+    for shot_name in sorted(missing):
+        print(f"⚠ {shot_name}: no existe en la secuencia {sequence.get('code') or sequence['id']} de ShotGrid, ignorado")
+
+    return sg.batch(batch_data)
+
 # ############ USE ####################################
 
 # finalMovement = get_camera_movement(shotCamera)
@@ -218,4 +320,10 @@ def get_camera_movement(camera):
 
 # sg.update("Shot", shotId, shotData)
 
+# Toda la secuencia del camera sequencer en un solo batch:
+
+# sequence = sg.find_one('Shot', [['id', 'is', context.entity['id']]], ['sg_sequence'])['sg_sequence']
+# sequence_movement = get_sequence_camera_movement()
+# update_shots_camera_movement(sg, context.project, sequence, sequence_movement)
+
 # #####################################################
\ No newline at end of file
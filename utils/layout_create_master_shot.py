@@ -69,79 +69,159 @@ def get_sequence_shots_data(sequence_code):
     return seq_dict, master_shot
 
 
-def create_sequence_cameras(seq_dict):
+def get_sequencer_shots():
+    """
+    Lee el estado actual del camera sequencer activo.
+
+    Returns:
+        dict: {shot_name: {shot_node, camera, start, end, seq_start, seq_end}}
+    """
+
+    seq_manager = cmds.sequenceManager(q=True, node=True)
+    sequencers = cmds.listConnections(seq_manager, type='sequencer') or []
+
+    existing = {}
+    for sequencer in sequencers:
+        for shot_node in cmds.listConnections(sequencer, type='shot') or []:
+            camera = cmds.listConnections(f"{shot_node}.currentCamera") or [None]
+            existing[cmds.getAttr(f"{shot_node}.shotName")] = {
+                'shot_node': shot_node,
+                'camera': camera[0],
+                'start': cmds.getAttr(f"{shot_node}.startFrame"),
+                'end': cmds.getAttr(f"{shot_node}.endFrame"),
+                'seq_start': cmds.getAttr(f"{shot_node}.sequenceStartFrame"),
+                'seq_end': cmds.getAttr(f"{shot_node}.sequenceEndFrame"),
+            }
+
+    return existing
+
+
+def create_sequence_cameras(seq_dict, delete_stale_cameras=False):
     """
     Crea cámaras para cada shot y las monta en el camera sequencer.
+
+    Rebuild incremental: compara los shots pedidos con el estado actual del sequencer
+    y solo crea, reajusta o borra los que han cambiado. Todo va en un único undo chunk.
     
     Args:
         seq_dict: {shot_name: {frame_in, frame_out}}
+        delete_stale_cameras: Borrar también la cámara ({shot}_cam) de los shots que ya no
+            están en la secuencia. Por defecto se conservan, con su animación
     """
-    
-    # Limpiar secuencia existente si hay
-    if cmds.objExists('sequencer2'):
-        shots = cmds.sequenceManager('sequencer2', q=True, listShots=True) or []
-        for shot in shots:
-            cmds.delete(shot)
-    
+
+    existing = get_sequencer_shots()
+
     cameras_info = {}
+    created, retimed, unchanged = [], [], []
     current_frame = 1001  # Frame inicial de la secuencia
     
     # Ordenar shots por nombre para mantener consistencia
     sorted_shots = sorted(seq_dict.keys())
-    
-    for shot_name in sorted_shots:
-        shot_data = seq_dict[shot_name]
-        
-        # Calcular duración del shot
-        shot_duration = shot_data['frame_out'] - shot_data['frame_in'] + 1
-        seq_start = current_frame
-        seq_end = current_frame + shot_duration - 1
-        
-        # Crear cámara
-        cam_transform, cam_shape = cmds.camera(name=f"{shot_name}_cam")
 
-        # Renombrar DESPUÉS de crear para asegurar el nombre exacto
-        cam_transform = cmds.rename(cam_transform, f"{shot_name}_cam")
+    cmds.undoInfo(openChunk=True, chunkName='create_sequence_cameras')
+
+    try:
+
+        # Borrar en una sola llamada los shots que ya no están en la secuencia
+        stale = [name for name in existing if name not in seq_dict]
+        to_delete = [existing[name]['shot_node'] for name in stale]
+        if delete_stale_cameras:
+            to_delete += [existing[name]['camera'] for name in stale
+                          if existing[name]['camera'] and existing[name]['camera'] == f"{name}_cam"]
+        else:
+            for name in stale:
+                if existing[name]['camera']:
+                    print(f"⚠ {name}: shot eliminado, se conserva su cámara {existing[name]['camera']}")
+        if to_delete:
+            cmds.delete(to_delete)
+    
+        for shot_name in sorted_shots:
+            shot_data = seq_dict[shot_name]
         
-        print(f"✓ Cámara creada: {cam_transform}")
+            # Calcular duración del shot
+            shot_duration = shot_data['frame_out'] - shot_data['frame_in'] + 1
+            seq_start = current_frame
+            seq_end = current_frame + shot_duration - 1
+
+            current = existing.get(shot_name)
+
+            # Cámara: reutilizar la existente si sigue en escena
+            cam_transform = f"{shot_name}_cam"
+            if cmds.objExists(cam_transform):
+                cam_shape = cmds.listRelatives(cam_transform, shapes=True)[0]
+            else:
+                # Crear cámara
+                cam_transform, cam_shape = cmds.camera(name=f"{shot_name}_cam")
+
+                # Renombrar DESPUÉS de crear para asegurar el nombre exacto
+                cam_transform = cmds.rename(cam_transform, f"{shot_name}_cam")
+                cam_shape = cmds.listRelatives(cam_transform, shapes=True)[0]
+
+                print(f"✓ Cámara creada: {cam_transform}")
                 
-        # Setear focal length (lens)
-        #cmds.setAttr(f"{cam_shape}.focalLength", shot_data['camera_lens'])
-        
-        # Crear shot en el sequencer
-        shot_node = cmds.shot(
-            shotName=shot_name,
-            currentCamera=cam_transform,
-            startTime=seq_start,      # Frame in interno del shot
-            endTime=seq_end,        # Frame out interno del shot
-            sequenceStartTime=seq_start,           # Donde empieza en la secuencia
-            sequenceEndTime=seq_end                # Donde termina en la secuencia
-        )
-        
-        # Guardar info
-        cameras_info[shot_name] = {
-            'camera': cam_transform,
-            'camera_shape': cam_shape,
-            'original_range': (shot_data['frame_in'], shot_data['frame_out']),
-            'sequence_range': (seq_start, seq_end),
-            'shot_node': shot_node
-        }
+            # Setear focal length (lens)
+            #cmds.setAttr(f"{cam_shape}.focalLength", shot_data['camera_lens'])
+
+            if not current:
+
+                # Crear shot en el sequencer
+                shot_node = cmds.shot(
+                    shotName=shot_name,
+                    currentCamera=cam_transform,
+                    startTime=seq_start,      # Frame in interno del shot
+                    endTime=seq_end,        # Frame out interno del shot
+                    sequenceStartTime=seq_start,           # Donde empieza en la secuencia
+                    sequenceEndTime=seq_end                # Donde termina en la secuencia
+                )
+                created.append(shot_name)
+
+            else:
+
+                shot_node = current['shot_node']
+                wanted = (seq_start, seq_end, seq_start, seq_end)
+                actual = (current['start'], current['end'], current['seq_start'], current['seq_end'])
+
+                if current['camera'] != cam_transform:
+                    cmds.shot(shot_node, e=True, currentCamera=cam_transform)
+
+                if wanted != actual:
+                    cmds.shot(
+                        shot_node, e=True,
+                        startTime=seq_start,
+                        endTime=seq_end,
+                        sequenceStartTime=seq_start,
+                        sequenceEndTime=seq_end
+                    )
+                    retimed.append(shot_name)
+                else:
+                    unchanged.append(shot_name)
         
-        print(f"✓ {shot_name}: frames {seq_start}-{seq_end}")
+            # Guardar info
+            cameras_info[shot_name] = {
+                'camera': cam_transform,
+                'camera_shape': cam_shape,
+                'original_range': (shot_data['frame_in'], shot_data['frame_out']),
+                'sequence_range': (seq_start, seq_end),
+                'shot_node': shot_node
+            }
         
-        # Actualizar frame para el siguiente shot
-        current_frame = seq_end + 1
-    
-    # Setear timeline al rango completo de la secuencia
-    cmds.playbackOptions(
-        min=1001,
-        max=current_frame - 1,
-        animationStartTime=1001,
-        animationEndTime=current_frame - 1
-    )
+            # Actualizar frame para el siguiente shot
+            current_frame = seq_end + 1
+    
+        # Setear timeline al rango completo de la secuencia
+        cmds.playbackOptions(
+            min=1001,
+            max=current_frame - 1,
+            animationStartTime=1001,
+            animationEndTime=current_frame - 1
+        )
+
+    finally:
+        cmds.undoInfo(closeChunk=True)
     
     print(f"\n✓ Secuencia completa: frames 1001-{current_frame - 1}")
     print(f"✓ Total shots: {len(cameras_info)}")
+    print(f"✓ Creados: {len(created)} | Reajustados: {len(retimed)} | Sin cambios: {len(unchanged)} | Borrados: {len(stale)}")
     cmds.select(cl=1)
     
     return cameras_info
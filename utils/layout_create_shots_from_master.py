@@ -1,7 +1,9 @@
 import sgtk
 import maya.cmds as mc
+import json
 import re
 import os
+from ..core import exporters
 
 # SUPER TEMP! We need to test it with Isma and Joaquin, be sure everything work as it should---------------------------------------------------------------------------------
 
@@ -11,6 +13,13 @@ import os
 
 #EVERYTHING ELSE IS ACCOUNTED FOR, CAMERAS, MAYA SCENES, KEYS, SHOTS, AND MASTER SEQUENCE SCENE
 
+# If True, shot scenes reference one shared layout file (exported once from the master)
+# plus a small per shot delta (camera reference, cropped animation, frame range),
+# instead of saving a full copy of the master scene for every shot and task.
+# Off until validated on production sequences, existing shot scenes are full copies
+REFERENCE_SHOTS = False
+LAYOUT_NAMESPACE = 'layout'
+
 engine = sgtk.platform.current_engine()
 sg = engine.shotgun
 context = engine.context
@@ -48,7 +57,148 @@ shots = mc.listConnections(sequencer, type="shot") or []  # Get a list of all sh
 all_cameras = list()
 for shot in shots:
     all_cameras.append(mc.listConnections(shot + '.currentCamera')[0])
-    
+
+
+def _namespaced(plug, namespace):
+    """
+    Prefix every DAG component of a plug with a namespace
+
+    Args:
+        plug (str): Plug as returned by listConnections (ej: 'char01:ctrl.tx')
+        namespace (str): Namespace of the shared layout reference
+
+    Returns:
+        str: Plug inside the namespace (ej: 'layout:char01:ctrl.tx')
+    """
+    node, attr = plug.split('.', 1)
+    parts = [f"{namespace}:{part}" if part else part for part in node.split('|')]
+    return '|'.join(parts) + '.' + attr
+
+
+def export_shared_layout(file_path, cameras):
+    """
+    Export the master layout content (everything but the shot cameras) once, so every
+    shot scene can reference it instead of carrying its own copy.
+
+    Args:
+        file_path (str): Destination .ma/.mb path (exporters.SCENE_FORMATS)
+        cameras (list): Shot cameras to leave out
+
+    Returns:
+        str: Exported file path
+    """
+    if not os.path.exists(os.path.dirname(file_path)):
+        os.makedirs(os.path.dirname(file_path))
+
+    default_cameras = mc.listRelatives(mc.ls(type='camera', long=True), parent=True, fullPath=True) or []
+    default_cameras = [c for c in default_cameras if mc.camera(c, q=True, startupCamera=True)]
+    excluded = set(mc.ls(cameras + default_cameras, long=True))
+
+    mc.select(_export_roots(excluded), r=True)
+    mc.file(file_path, type=exporters.get_scene_format('maya_shot_publish', 'Layout'), exportSelected=True, preserveReferences=True, force=True)
+    mc.select(cl=1)
+
+    return file_path
+
+
+def _export_roots(excluded):
+    """
+    DAG nodes to select so the export holds the whole scene but the excluded paths:
+    a group holding an excluded node (ej: a cameras group) is replaced by its other
+    children, exportSelected still writes the group as their parent
+
+    Args:
+        excluded (set): Long names to leave out
+    """
+    roots = []
+    pending = mc.ls(assemblies=True, long=True)
+    while pending:
+        node = pending.pop(0)
+        if node in excluded:
+            continue
+        if any(path.startswith(node + '|') for path in excluded):
+            pending.extend(mc.listRelatives(node, children=True, fullPath=True) or [])
+        else:
+            roots.append(node)
+    return roots
+
+
+def export_shot_animation_delta(file_path, cameras):
+    """
+    Export the (already cropped and offset) local animCurves of the master scene with a
+    json map of the plugs they drive. Camera curves are skipped, they travel with the
+    camera publish.
+
+    Args:
+        file_path (str): Destination .ma/.mb path for the curves (exporters.SCENE_FORMATS)
+        cameras (list): Shot cameras whose curves are excluded
+
+    Returns:
+        dict: {curve: [plugs]} written next to the curves file as .json
+    """
+    camera_nodes = set(mc.ls(cameras, long=True))
+    for cam in cameras:
+        camera_nodes.update(mc.listRelatives(cam, shapes=True, fullPath=True) or [])
+
+    connections = {}
+    for curve in mc.ls(type='animCurve') or []:
+        if mc.referenceQuery(curve, isNodeReferenced=True):
+            continue
+        plugs = mc.listConnections(curve + '.output', plugs=True, source=False, destination=True) or []
+        plugs = [p for p in plugs if (mc.ls(p.split('.', 1)[0], long=True) or [''])[0] not in camera_nodes]
+        if plugs:
+            connections[curve] = plugs
+
+    if connections:
+        mc.select(list(connections), r=True)
+        mc.file(file_path, type=exporters.get_scene_format('shot_anim_delta', 'Layout'), exportSelected=True, constructionHistory=False, channels=False, force=True)
+        mc.select(cl=1)
+
+    with open(os.path.splitext(file_path)[0] + '.json', 'w') as f:
+        json.dump(connections, f, indent=4)
+
+    return connections
+
+
+def build_referenced_shot_scene(shared_layout_path, anim_delta_path, connections, camera_path, camera_namespace):
+    """
+    Build a light shot scene: shared layout reference + cropped animation + camera reference
+
+    Args:
+        shared_layout_path (str): Shared layout file exported with export_shared_layout
+        anim_delta_path (str): Curves exported with export_shot_animation_delta
+        connections (dict): {curve: [plugs]} from export_shot_animation_delta
+        camera_path (str): Shot camera publish (.ma)
+        camera_namespace (str): Namespace for the camera reference
+    """
+    mc.file(new=True, force=True)
+
+    mc.file(shared_layout_path, r=True, ignoreVersion=True, namespace=LAYOUT_NAMESPACE)
+
+    if connections:
+        anim_namespace = camera_namespace + '_anim'
+        mc.file(anim_delta_path, i=True, ignoreVersion=True, namespace=anim_namespace)
+        for curve, plugs in connections.items():
+            for plug in plugs:
+                try:
+                    mc.connectAttr(f"{anim_namespace}:{curve}.output", _namespaced(plug, LAYOUT_NAMESPACE), force=True)
+                except Exception as e:
+                    print(f"⚠ No se pudo conectar {curve} -> {plug}: {e}")
+
+    mc.file(camera_path, r=True, ignoreVersion=True, namespace=camera_namespace)
+
+
+# Shared layout for every shot, exported once from the untouched master scene
+
+if REFERENCE_SHOTS:
+
+    template = tk.templates["maya_shot_publish"]
+    master_fields = tk.templates["maya_shot_work"].get_fields(current_file)
+    master_fields["name"] = 'layoutShared'
+    shared_layout_path = export_shared_layout(exporters.scene_format_path(template.apply_fields(master_fields), exporters.get_scene_format('maya_shot_publish', 'Layout')), all_cameras)
+    print(f"✓ Shared layout: {shared_layout_path}")
+
+
 # logic for all shots to export them separately
 
 for shot in shots:
@@ -152,19 +302,30 @@ for shot in shots:
     cmd = '-root ' + shot_camera + ' -frameRange ' + str(start_frame-offset) + ' ' + str(end_frame-offset) + ' -step 1 -worldSpace -writeVisibility -dataFormat ogawa -file ' + camera_publish_path_abc
     mc.AbcExport(j=cmd)
     
-    #Delete shots from sequencer
-   
-    mc.delete(shots)
-    
-    # Delete other shot cameras
-    for cam in all_cameras:
-        try:
-            mc.delete(cam)
-        except:pass
-        
-    # Import shot camera (as .ma for now)------------------------------------------------
-    
-    mc.file(camera_publish_path_ma, r=True, ignoreVersion=True, namespace=shot_camera)
+    if REFERENCE_SHOTS:
+
+        # export cropped animation as a small delta and rebuild the shot from references
+
+        anim_delta_path = camera_publish_area + '/' + shot_name + '_anim_v' + str(f'{current_version:03}' + '.ma')
+        anim_delta_path = exporters.scene_format_path(anim_delta_path, exporters.get_scene_format('shot_anim_delta', 'Layout'))
+        connections = export_shot_animation_delta(anim_delta_path, all_cameras)
+        build_referenced_shot_scene(shared_layout_path, anim_delta_path, connections, camera_publish_path_ma, shot_camera)
+
+    else:
+
+        #Delete shots from sequencer
+
+        mc.delete(shots)
+
+        # Delete other shot cameras
+        for cam in all_cameras:
+            try:
+                mc.delete(cam)
+            except:pass
+
+        # Import shot camera (as .ma for now)------------------------------------------------
+
+        mc.file(camera_publish_path_ma, r=True, ignoreVersion=True, namespace=shot_camera)
 
     # Set frame range in scene
     mc.playbackOptions(min = start_frame-offset, max = end_frame-offset)